@@ -1,21 +1,923 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import numpy as np
 import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
 import joblib
 import os
+import sys
+import json
+import time
+import random
+import sqlite3
+import threading
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
 from typing import Dict, List, Any
+import copy
+import functools
 import hashlib
+import hmac
+import itertools
+import atexit
+
+# Optional binary response encoders; each format is offered only when its package is installed
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
 
 app = Flask(__name__)
 CORS(app)
 
+MBTI_TYPES = [
+    'INTJ', 'INTP', 'ENTJ', 'ENTP', 'INFJ', 'INFP', 'ENFJ', 'ENFP',
+    'ISTJ', 'ISFJ', 'ESTJ', 'ESFJ', 'ISTP', 'ISFP', 'ESTP', 'ESFP'
+]
+RIASEC_TYPES = ['R', 'I', 'A', 'S', 'E', 'C']
+COGNITIVE_FUNCTIONS = {
+    'INTJ': ['Ni', 'Te', 'Fi', 'Se'], 'INTP': ['Ti', 'Ne', 'Si', 'Fe'],
+    'ENTJ': ['Te', 'Ni', 'Se', 'Fi'], 'ENTP': ['Ne', 'Ti', 'Fe', 'Si'],
+    'INFJ': ['Ni', 'Fe', 'Ti', 'Se'], 'INFP': ['Fi', 'Ne', 'Si', 'Te'],
+    'ENFJ': ['Fe', 'Ni', 'Se', 'Ti'], 'ENFP': ['Ne', 'Fi', 'Te', 'Si'],
+    'ISTJ': ['Si', 'Te', 'Fi', 'Ne'], 'ISFJ': ['Si', 'Fe', 'Ti', 'Ne'],
+    'ESTJ': ['Te', 'Si', 'Ne', 'Fi'], 'ESFJ': ['Fe', 'Si', 'Ne', 'Ti'],
+    'ISTP': ['Ti', 'Se', 'Ni', 'Fe'], 'ISFP': ['Fi', 'Se', 'Ni', 'Te'],
+    'ESTP': ['Se', 'Ti', 'Fe', 'Ni'], 'ESFP': ['Se', 'Fi', 'Te', 'Ni']
+}
+DEFAULT_TRAITS = {
+    "analytical": 0.5, "technical": 0.5, "creativity": 0.5,
+    "social": 0.5, "leadership": 0.5, "structured": 0.5, "practical": 0.5
+}
+
+# Candidate pool size, as a multiple of top_n, re-ranked in diversity mode
+DIVERSITY_POOL_FACTOR = 3
+
+# Compiled catalog weight precision, and whether a reduced-precision top-k is re-scored exactly
+SCORING_PRECISIONS = ('float64', 'float16', 'int8')
+RECOMMENDER_PRECISION = os.environ.get('RECOMMENDER_PRECISION', 'float64')
+RECOMMENDER_EXACT_RESCORE = os.environ.get('RECOMMENDER_EXACT_RESCORE', '1') != '0'
+# Candidates re-scored exactly, as a multiple of the number of results needed
+RESCORE_POOL_FACTOR = 2
+# Careers sampled by the precision report, so it never builds a float64 copy of a large catalog
+PRECISION_REPORT_SAMPLE_SIZE = 20000
+
+# Careers refined in the first round of threshold top-k, highest upper bound first; it doubles every round
+THRESHOLD_INITIAL_BATCH = 64
+# Slack on the upper bounds so float rounding never prunes a career that could tie the k-th score
+THRESHOLD_EPSILON = 1e-9
+# If the first round leaves more than this fraction of eligible careers unpruned, refine the rest in one pass
+THRESHOLD_FALLBACK_FRACTION = 0.5
+# Eligible careers given cheap component scores per block, with a deadline check between blocks
+THRESHOLD_CHEAP_BLOCK = 16384
+
+# Trait sweeps: grid points per request, and grid point x career scores computed per block
+MAX_SWEEP_POINTS = 101
+SWEEP_BLOCK_ELEMENTS = 8_000_000
+
+# Optional JSON file of tenant overlays ({tenant_id: {"add": [...], "hide": [...], "override": {...}}})
+TENANT_OVERLAYS_PATH = os.environ.get('TENANT_OVERLAYS_PATH')
+TENANT_HEADER = 'X-Tenant-ID'
+TENANT_REQUIRED_CAREER_FIELDS = ('id', 'title', 'category', 'salary_min', 'personality_profile')
+
+# Response formats offered through content negotiation on the Accept header
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+# Scalar and list career fields written as Arrow columns by /api/careers
+ARROW_CAREER_FIELDS = (
+    ('id', 'int64'), ('title', 'string'), ('category', 'string'), ('description', 'string'),
+    ('salary_min', 'int64'), ('salary_max', 'int64'), ('growth', 'int64'), ('experience_level', 'string'),
+    ('skills', 'list<string>'), ('personality_traits', 'list<string>'), ('work_environment', 'list<string>'),
+    ('version', 'int64')
+)
+SCORE_COMPONENTS = ('mbti', 'riasec', 'ikigai', 'skills', 'traits')
+
+# Bearer token required by the admin endpoints; they are disabled when unset
+ADMIN_TOKEN = os.environ.get('RECOMMENDER_ADMIN_TOKEN')
+
+# Optional JSON file holding the career catalog; the built-in catalog is used when unset
+CAREER_CATALOG_PATH = os.environ.get('CAREER_CATALOG_PATH')
+# Catalog change-log entries kept for delta sync; older clients get a full resync
+CATALOG_CHANGE_LOG_SIZE = 10000
+# Recommender attributes derived from the catalog; a reload builds them aside and swaps them in together
+CATALOG_STATE_ATTRIBUTES = (
+    'career_database', 'career_index_by_id', 'catalog_fingerprint',
+    'category_masks', 'education_masks', 'salary_min_array',
+    'ikigai_elements', 'trait_names', 'categories', 'career_feature_matrix',
+    'similar_career_indices', 'similar_career_scores', 'compiled_catalog', 'tenant_overlays'
+)
+
+# Profile fields that affect recommendation output, including the top-level traits read by personality fit
+CANONICAL_PROFILE_FIELDS = (
+    'mbti', 'riasec', 'ikigai', 'skills', 'traits',
+    'creativity', 'analytical', 'social', 'technical', 'leadership', 'structured', 'practical'
+)
+
+# Opt-in traffic capture: anonymized /api/recommend-careers bodies are appended here as JSONL
+CAPTURE_PATH = os.environ.get('RECOMMENDATION_CAPTURE_PATH')
+CAPTURED_PROFILE_FIELDS = CANONICAL_PROFILE_FIELDS
+CAPTURED_REQUEST_FIELDS = ('constraints', 'diversity', 'threshold', 'deadline_ms')
+
+# Fraction of recommendation requests whose allocations are traced (0 disables tracemalloc)
+MEMORY_TRACKING_SAMPLE_RATE = float(os.environ.get('MEMORY_TRACKING_SAMPLE_RATE', '0'))
+
+# Recommendation cache: a per-process LRU tier plus an optional SQLite tier shared by all workers on a host
+RECOMMENDATION_CACHE_SIZE = int(os.environ.get('RECOMMENDATION_CACHE_SIZE', '1024'))
+RECOMMENDATION_CACHE_PATH = os.environ.get('RECOMMENDATION_CACHE_PATH')
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.environ.get('RECOMMENDATION_CACHE_MAX_ENTRIES', '100000'))
+# Shared-tier writes between size checks, so eviction does not count rows on every write
+SHARED_CACHE_EVICTION_INTERVAL = 100
+# Shared-tier hits whose last_access updates are buffered and written together, so reads stay reads
+SHARED_CACHE_TOUCH_BATCH = 100
+
+# Bumped whenever the shape of a cached get_recommendations result changes
+RECOMMENDATION_SCHEMA_VERSION = 3
+
+# Opt-in hot-profile tracking: the most requested profiles are persisted and re-warmed on startup
+HOT_PROFILES_PATH = os.environ.get('HOT_PROFILES_PATH')
+HOT_PROFILES_TOP_K = int(os.environ.get('HOT_PROFILES_TOP_K', '2000'))
+HOT_PROFILES_PERSIST_INTERVAL = float(os.environ.get('HOT_PROFILES_PERSIST_INTERVAL', '300'))
+# Count-Min sketch shape; estimates overshoot by at most ~e/width of all requests with probability 1 - e^-depth
+HOT_PROFILES_SKETCH_WIDTH = 16384
+HOT_PROFILES_SKETCH_DEPTH = 4
+# Counts carried over from the persisted set are scaled by this on load, so old heat fades across deploys
+HOT_PROFILES_DECAY = 0.5
+
+# Neighbour lists kept per career, and similarity matrix entries computed per block while building them
+SIMILAR_CAREERS_K = 10
+SIMILARITY_BLOCK_ELEMENTS = 16_000_000
+
+def deep_sizeof(obj, seen=None) -> int:
+    """Approximate resident size of an object graph in bytes, counting shared objects once"""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    
+    if isinstance(obj, np.ndarray):
+        base = obj.base if isinstance(obj.base, np.ndarray) else None
+        return sys.getsizeof(obj) + (deep_sizeof(base, seen) if base is not None else 0)
+    
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, seen) + deep_sizeof(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+class AllocationTracker:
+    """Samples per-phase allocations with tracemalloc; figures are approximate under concurrency"""
+    
+    def __init__(self, sample_rate: float = 0.0):
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+        self.phases = {}
+        if sample_rate > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+    
+    @contextmanager
+    def track(self, phase: str, sampled: bool):
+        if not sampled or not tracemalloc.is_tracing():
+            yield
+            return
+        
+        # The lock only guards the stats; holding it across the phase would serialize sampled requests
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            after, peak = tracemalloc.get_traced_memory()
+            net, peak_growth = after - before, max(peak - before, 0)
+            with self.lock:
+                stats = self.phases.setdefault(phase, {
+                    "samples": 0, "total_net_bytes": 0, "max_net_bytes": 0,
+                    "total_peak_bytes": 0, "max_peak_bytes": 0
+                })
+                stats["samples"] += 1
+                stats["total_net_bytes"] += net
+                stats["max_net_bytes"] = max(stats["max_net_bytes"], net)
+                stats["total_peak_bytes"] += peak_growth
+                stats["max_peak_bytes"] = max(stats["max_peak_bytes"], peak_growth)
+    
+    def report(self, top_allocations: int = 10) -> Dict[str, Any]:
+        """Summarize sampled allocations per phase and the current largest allocation sites"""
+        with self.lock:
+            phases = {
+                phase: {
+                    "samples": stats["samples"],
+                    "mean_net_bytes": stats["total_net_bytes"] // stats["samples"],
+                    "max_net_bytes": stats["max_net_bytes"],
+                    "mean_peak_bytes": stats["total_peak_bytes"] // stats["samples"],
+                    "max_peak_bytes": stats["max_peak_bytes"]
+                } for phase, stats in self.phases.items()
+            }
+        
+        report = {"enabled": tracemalloc.is_tracing(), "sample_rate": self.sample_rate, "approximate": True,
+                  "phases": phases}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            report["traced_current_bytes"] = current
+            report["traced_peak_bytes"] = peak
+            report["top_allocations"] = [
+                {"location": str(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+                for stat in tracemalloc.take_snapshot().statistics("lineno")[:top_allocations]
+            ]
+        return report
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first, breaking ties by position like a stable sort"""
+    if k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    kth_score = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    above = np.flatnonzero(scores > kth_score)
+    ties = np.flatnonzero(scores == kth_score)[:k - len(above)]
+    candidates = np.sort(np.concatenate([above, ties]))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+class QuantizedMatrix:
+    """A weight matrix stored as float64, float16, or int8 with per-column scales"""
+    
+    def __init__(self, matrix: np.ndarray, precision: str = "float64"):
+        if precision not in SCORING_PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}")
+        self.precision = precision
+        self.shape = matrix.shape
+        self.scales = None
+        if precision == "int8":
+            max_abs = np.abs(matrix).max(axis=0) if len(matrix) else np.zeros(matrix.shape[1])
+            self.scales = np.where(max_abs > 0, max_abs / 127.0, 1.0)
+            self.values = np.round(matrix / self.scales).astype(np.int8)
+        else:
+            self.values = matrix.astype(precision)
+    
+    def take(self, rows: np.ndarray, column=None) -> np.ndarray:
+        """Dequantize the selected rows (and optionally one column) to float64"""
+        if column is None:
+            values = self.values[rows].astype(np.float64, copy=False)
+            return values * self.scales if self.scales is not None else values
+        values = self.values[rows, column].astype(np.float64, copy=False)
+        return values * self.scales[column] if self.scales is not None else values
+    
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+    
+    @property
+    def float64_nbytes(self) -> int:
+        return self.values.size * 8
+
+class CompiledCatalog:
+    """Column-oriented form of a career catalog for vectorized scoring, term for term like the calculate_* methods"""
+    
+    def __init__(self, careers: List[Dict], precision: str = "float64"):
+        self.size = len(careers)
+        self.precision = precision
+        profiles = [career["personality_profile"] for career in careers]
+        
+        self.mbti_index = {mbti: column for column, mbti in enumerate(MBTI_TYPES)}
+        self.mbti_common = np.array([
+            [len(set(COGNITIVE_FUNCTIONS[a]) & set(COGNITIVE_FUNCTIONS[b])) / 4.0 for b in MBTI_TYPES]
+            for a in MBTI_TYPES
+        ])
+        self.mbti_weights = QuantizedMatrix(np.array(
+            [[profile["mbti_weights"].get(mbti, 0.0) for mbti in MBTI_TYPES] for profile in profiles]
+        ).reshape(self.size, len(MBTI_TYPES)), precision)
+        
+        self.riasec_index = {riasec: column for column, riasec in enumerate(RIASEC_TYPES)}
+        self.riasec_weights = QuantizedMatrix(np.array(
+            [[profile["riasec_weights"].get(riasec, 0.0) for riasec in RIASEC_TYPES] for profile in profiles]
+        ).reshape(self.size, len(RIASEC_TYPES)), precision)
+        
+        ikigai_elements = sorted({element for profile in profiles for element in profile["ikigai_weights"]})
+        self.ikigai_index = {element: column for column, element in enumerate(ikigai_elements)}
+        self.ikigai_present = np.array(
+            [[element in profile["ikigai_weights"] for element in ikigai_elements] for profile in profiles], dtype=bool
+        ).reshape(self.size, len(ikigai_elements))
+        self.ikigai_weights = QuantizedMatrix(np.array(
+            [[profile["ikigai_weights"].get(element, 0.0) for element in ikigai_elements] for profile in profiles]
+        ).reshape(self.size, len(ikigai_elements)), precision)
+        
+        domains = sorted({domain.lower() for profile in profiles for domain in profile["skill_domains"]})
+        self.skill_domains = domains
+        domain_index = {domain: column for column, domain in enumerate(domains)}
+        self.skill_domain_matrix = np.zeros((self.size, len(domains)), dtype=bool)
+        self.skill_domain_counts = np.array([len(profile["skill_domains"]) for profile in profiles], dtype=np.int32)
+        for row, profile in enumerate(profiles):
+            for domain in profile["skill_domains"]:
+                self.skill_domain_matrix[row, domain_index[domain.lower()]] = True
+        
+        # Traits are stored as slots in each career's own key order so sums match the loop exactly
+        self.trait_names = sorted({trait for profile in profiles for trait in profile["trait_profile"]})
+        trait_index = {trait: column for column, trait in enumerate(self.trait_names)}
+        slots = max((len(profile["trait_profile"]) for profile in profiles), default=0)
+        self.trait_slot_columns = np.zeros((self.size, slots), dtype=np.int32)
+        self.trait_slot_valid = np.zeros((self.size, slots), dtype=bool)
+        trait_slot_values = np.zeros((self.size, slots))
+        for row, profile in enumerate(profiles):
+            for slot, (trait, value) in enumerate(profile["trait_profile"].items()):
+                self.trait_slot_columns[row, slot] = trait_index[trait]
+                self.trait_slot_valid[row, slot] = True
+                trait_slot_values[row, slot] = value
+        self.trait_slot_values = QuantizedMatrix(trait_slot_values, precision)
+        self.trait_counts = self.trait_slot_valid.sum(axis=1)
+        
+        self.threshold_lock = threading.Lock()
+        self.threshold_index_built = False
+    
+    def user_trait_vector(self, user_profile: Dict) -> np.ndarray:
+        user_traits = {**DEFAULT_TRAITS, **user_profile.get("traits", {})}
+        return np.array([user_traits.get(trait, 0.5) for trait in self.trait_names])
+    
+    def score_mbti(self, user_mbti: str, rows: np.ndarray) -> np.ndarray:
+        if not user_mbti:
+            return np.full(len(rows), 0.5)
+        column = self.mbti_index.get(user_mbti)
+        if column is None:
+            return np.zeros(len(rows))
+        # Only types sharing a cognitive function can raise the max above zero, one column at a time
+        cognitive = np.zeros(len(rows))
+        for other in np.flatnonzero(self.mbti_common[column] > 0):
+            cognitive = np.maximum(cognitive, self.mbti_common[column, other] * self.mbti_weights.take(rows, other))
+        return 0.7 * self.mbti_weights.take(rows, column) + 0.3 * cognitive
+    
+    def score_riasec(self, user_riasec: List[str], rows: np.ndarray) -> np.ndarray:
+        if not user_riasec:
+            return np.full(len(rows), 0.5)
+        total_score = np.zeros(len(rows))
+        max_possible = 0.0
+        for i, riasec_type in enumerate(user_riasec):
+            weight = 1.0 / (i + 1)
+            column = self.riasec_index.get(riasec_type)
+            if column is not None:
+                total_score = total_score + self.riasec_weights.take(rows, column) * weight
+            max_possible += weight
+        return total_score / max_possible
+    
+    def score_ikigai(self, user_ikigai: List[str], rows: np.ndarray) -> np.ndarray:
+        if not user_ikigai:
+            return np.full(len(rows), 0.5)
+        total_score = np.zeros(len(rows))
+        matched_elements = np.zeros(len(rows), dtype=np.int64)
+        for element in user_ikigai:
+            column = self.ikigai_index.get(element)
+            if column is None:
+                continue
+            present = self.ikigai_present[rows, column]
+            total_score = total_score + np.where(present, self.ikigai_weights.take(rows, column), 0.0)
+            matched_elements += present
+        total_score = np.where(matched_elements > 1, total_score * (1.0 + 0.1 * (matched_elements - 1)), total_score)
+        return np.minimum(1.0, total_score / len(user_ikigai))
+    
+    def score_skills(self, user_skills: List[str], rows: np.ndarray) -> np.ndarray:
+        if not user_skills:
+            return np.full(len(rows), 0.3)
+        domain_matrix = self.skill_domain_matrix[rows]
+        matches = np.zeros(len(rows), dtype=np.int64)
+        for user_skill in (skill.lower() for skill in user_skills):
+            matching = [column for column, domain in enumerate(self.skill_domains)
+                        if user_skill in domain or domain in user_skill]
+            if matching:
+                matches += domain_matrix[:, matching].any(axis=1)
+        counts = self.skill_domain_counts[rows]
+        return np.where(counts > 0, matches / np.maximum(counts, 1), 0.0)
+    
+    def score_traits(self, user_trait_vectors: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Trait similarity for one (T,) or many (G, T) user trait vectors, broadcast over rows"""
+        columns = self.trait_slot_columns[rows]
+        valid = self.trait_slot_valid[rows]
+        similarity = np.zeros(user_trait_vectors.shape[:-1] + (len(rows),))
+        for slot in range(columns.shape[1]):
+            user_values = user_trait_vectors[..., columns[:, slot]]
+            values = self.trait_slot_values.take(rows, slot)
+            similarity = similarity + np.where(valid[:, slot], 1.0 - np.abs(user_values - values), 0.0)
+        counts = self.trait_counts[rows]
+        return np.where(counts > 0, similarity / np.maximum(counts, 1), 0.5)
+    
+    def score(self, user_profile: Dict, rows: np.ndarray, weights: Dict[str, float]):
+        """Score the given rows; returns (total scores, per-component score arrays)"""
+        components = {
+            "mbti": self.score_mbti(user_profile.get("mbti"), rows),
+            "riasec": self.score_riasec(user_profile.get("riasec", []), rows),
+            "ikigai": self.score_ikigai(user_profile.get("ikigai", []), rows),
+            "skills": self.score_skills(user_profile.get("skills", []), rows),
+            "traits": self.score_traits(self.user_trait_vector(user_profile), rows)
+        }
+        total = (
+            weights["mbti"] * components["mbti"] +
+            weights["riasec"] * components["riasec"] +
+            weights["ikigai"] * components["ikigai"] +
+            weights["skills"] * components["skills"] +
+            weights["traits"] * components["traits"]
+        )
+        return total, components
+    
+    def build_threshold_index(self):
+        """Precompute each career's largest MBTI weight, on first use, to bound its cognitive score"""
+        with self.threshold_lock:
+            if self.threshold_index_built:
+                return
+            rows = np.arange(self.size)
+            row_max = np.zeros(self.size)
+            for column in range(self.mbti_weights.shape[1]):
+                row_max = np.maximum(row_max, self.mbti_weights.take(rows, column))
+            self.mbti_row_max = row_max
+            self.threshold_index_built = True
+    
+    def threshold_top_k(self, user_profile: Dict, weights: Dict[str, float], eligible: np.ndarray,
+                        k: int, deadline: float = None):
+        """Exact top-k that fully scores only careers whose upper bound can still reach the k-th score"""
+        self.build_threshold_index()
+        user_mbti = user_profile.get("mbti")
+        user_traits = self.user_trait_vector(user_profile)
+        eligible_rows = np.flatnonzero(eligible)
+        partial = False
+        
+        blocks = {"riasec": [], "ikigai": [], "skills": [], "bounds": []}
+        for start in range(0, len(eligible_rows), THRESHOLD_CHEAP_BLOCK):
+            if start and deadline is not None and time.perf_counter() >= deadline:
+                # Careers past the blocks already bounded are left out of a partial result
+                eligible_rows = eligible_rows[:start]
+                partial = True
+                break
+            rows = eligible_rows[start:start + THRESHOLD_CHEAP_BLOCK]
+            riasec = self.score_riasec(user_profile.get("riasec", []), rows)
+            ikigai = self.score_ikigai(user_profile.get("ikigai", []), rows)
+            skills = self.score_skills(user_profile.get("skills", []), rows)
+            if not user_mbti:
+                mbti_bound = np.full(len(rows), 0.5)
+            elif user_mbti not in self.mbti_index:
+                mbti_bound = np.zeros(len(rows))
+            else:
+                # The cognitive term is at most the row's largest MBTI weight
+                mbti_bound = (0.7 * self.mbti_weights.take(rows, self.mbti_index[user_mbti]) +
+                              0.3 * np.maximum(self.mbti_row_max[rows], 0.0))
+            traits_bound = np.where(self.trait_counts[rows] > 0, 1.0, 0.5)
+            blocks["riasec"].append(riasec)
+            blocks["ikigai"].append(ikigai)
+            blocks["skills"].append(skills)
+            blocks["bounds"].append(
+                weights["mbti"] * mbti_bound + weights["riasec"] * riasec + weights["ikigai"] * ikigai +
+                weights["skills"] * skills + weights["traits"] * traits_bound + THRESHOLD_EPSILON
+            )
+        cheap = {name: np.concatenate(parts) if parts else np.zeros(0) for name, parts in blocks.items()}
+        bounds = cheap.pop("bounds")
+        
+        scored_positions, scored_totals = [], []
+        scored_components = {"mbti": [], "traits": []}
+        remaining = np.arange(len(eligible_rows))
+        batch = max(k, THRESHOLD_INITIAL_BATCH)
+        first_round = True
+        
+        while len(remaining):
+            if len(remaining) > batch:
+                split = np.argpartition(-bounds[remaining], batch - 1)
+                positions, remaining = remaining[split[:batch]], remaining[split[batch:]]
+            else:
+                positions, remaining = remaining, remaining[:0]
+            
+            # Same term order as score(), so refined totals equal the full scan's bit for bit
+            rows = eligible_rows[positions]
+            mbti = self.score_mbti(user_mbti, rows)
+            traits = self.score_traits(user_traits, rows)
+            total = (
+                weights["mbti"] * mbti + weights["riasec"] * cheap["riasec"][positions] +
+                weights["ikigai"] * cheap["ikigai"][positions] + weights["skills"] * cheap["skills"][positions] +
+                weights["traits"] * traits
+            )
+            scored_positions.append(positions)
+            scored_totals.append(total)
+            scored_components["mbti"].append(mbti)
+            scored_components["traits"].append(traits)
+            
+            count = sum(len(part) for part in scored_positions)
+            if count >= k and len(remaining):
+                totals = np.concatenate(scored_totals)
+                kth_score = -np.partition(-totals, k - 1)[k - 1]
+                before = len(remaining)
+                remaining = remaining[bounds[remaining] >= kth_score]
+                if first_round and deadline is None and len(remaining) > THRESHOLD_FALLBACK_FRACTION * before:
+                    batch = len(remaining)
+            if len(remaining) and deadline is not None and (partial or time.perf_counter() >= deadline):
+                partial = True
+                break
+            first_round = False
+            batch *= 2
+        
+        if not scored_positions:
+            empty = np.zeros(0)
+            return np.zeros(0, dtype=np.int64), empty, {name: empty for name in SCORE_COMPONENTS}, {
+                "careers_scored": 0, "partial": partial
+            }
+        
+        positions = np.concatenate(scored_positions)
+        by_row = np.argsort(positions, kind="stable")
+        positions = positions[by_row]
+        totals = np.concatenate(scored_totals)[by_row]
+        refined = {name: np.concatenate(parts)[by_row] for name, parts in scored_components.items()}
+        top = top_k_indices(totals, k)
+        components = {
+            "mbti": refined["mbti"][top],
+            "riasec": cheap["riasec"][positions[top]],
+            "ikigai": cheap["ikigai"][positions[top]],
+            "skills": cheap["skills"][positions[top]],
+            "traits": refined["traits"][top]
+        }
+        return eligible_rows[positions[top]], totals[top], components, {
+            "careers_scored": len(positions), "partial": partial
+        }
+    
+    @property
+    def nbytes(self) -> int:
+        matrices = [self.mbti_weights, self.riasec_weights, self.ikigai_weights, self.trait_slot_values]
+        arrays = [self.mbti_common, self.ikigai_present, self.skill_domain_matrix, self.skill_domain_counts,
+                  self.trait_slot_columns, self.trait_slot_valid, self.trait_counts]
+        if self.threshold_index_built:
+            arrays.append(self.mbti_row_max)
+        return sum(matrix.nbytes for matrix in matrices) + sum(array.nbytes for array in arrays)
+    
+    @property
+    def float64_nbytes(self) -> int:
+        """Size this catalog would have with its weight matrices stored as float64"""
+        matrices = [self.mbti_weights, self.riasec_weights, self.ikigai_weights, self.trait_slot_values]
+        return self.nbytes - sum(matrix.nbytes for matrix in matrices) + sum(matrix.float64_nbytes for matrix in matrices)
+
+class UnknownTenantError(KeyError):
+    """Raised when a request names a tenant that has no overlay"""
+
+class TenantOverlay:
+    """A tenant's added, hidden and overridden careers layered over the shared base catalog without copying it"""
+    
+    def __init__(self, tenant_id: str, spec: Dict[str, Any], version: int = 1):
+        if not isinstance(spec, dict):
+            raise ValueError("tenant overlay must be an object")
+        unknown = set(spec) - {"add", "hide", "override"}
+        if unknown:
+            raise ValueError(f"Unsupported overlay fields: {', '.join(sorted(unknown))}")
+        
+        added = spec.get("add", [])
+        if not isinstance(added, list) or not all(isinstance(career, dict) for career in added):
+            raise ValueError("overlay add must be a list of careers")
+        for career in added:
+            missing = [field for field in TENANT_REQUIRED_CAREER_FIELDS if field not in career]
+            if missing:
+                raise ValueError(f"added career is missing {', '.join(missing)}")
+            if isinstance(career["id"], bool) or not isinstance(career["id"], int):
+                raise ValueError("added careers need an integer id")
+        if len({career["id"] for career in added}) != len(added):
+            raise ValueError("added career ids must be unique")
+        
+        hidden = spec.get("hide", [])
+        if not isinstance(hidden, list) or any(isinstance(i, bool) or not isinstance(i, int) for i in hidden):
+            raise ValueError("overlay hide must be a list of career ids")
+        
+        overrides = spec.get("override", {})
+        if not isinstance(overrides, dict) or not all(isinstance(fields, dict) for fields in overrides.values()):
+            raise ValueError("overlay override must map career ids to fields")
+        try:
+            overrides = {int(career_id): fields for career_id, fields in overrides.items()}
+        except (TypeError, ValueError):
+            raise ValueError("overlay override keys must be career ids")
+        
+        self.tenant_id = tenant_id
+        self.version = version
+        self.fingerprint = hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+        self.added = added
+        self.hidden = set(hidden)
+        self.overrides = overrides
+    
+    def build(self, recommender: "AdvancedCareerRecommender"):
+        """Resolve the overlay against the current base catalog and compile its own careers"""
+        base_index = recommender.career_index_by_id
+        careers = []
+        excluded = {base_index[career_id] for career_id in self.hidden if career_id in base_index}
+        
+        # Added careers replace any base career with the same id
+        for career in self.added:
+            if career["id"] in self.hidden:
+                continue
+            careers.append(dict(career))
+            if career["id"] in base_index:
+                excluded.add(base_index[career["id"]])
+        
+        added_ids = {career["id"] for career in self.added}
+        for career_id, fields in self.overrides.items():
+            if career_id in self.hidden or career_id in added_ids or career_id not in base_index:
+                continue
+            base_career = recommender.career_database[base_index[career_id]]
+            careers.append({**base_career, **fields, "id": career_id})
+            excluded.add(base_index[career_id])
+        
+        try:
+            compiled = CompiledCatalog(careers, recommender.precision)
+            feature_matrix = QuantizedMatrix(recommender.compute_career_features(careers)[1], recommender.precision)
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            raise ValueError(f"Invalid overlay for tenant {self.tenant_id}: {str(e)}")
+        
+        self.careers = careers
+        self.excluded_rows = np.array(sorted(excluded), dtype=np.int64)
+        self.compiled = compiled
+        self.feature_matrix = feature_matrix
+    
+    @property
+    def nbytes(self) -> int:
+        return (deep_sizeof(self.careers) + self.compiled.nbytes +
+                self.excluded_rows.nbytes + self.feature_matrix.nbytes)
+
+class SharedRecommendationStore:
+    """SQLite-backed (WAL) cache tier shared by every worker process on a host, evicted least-recently-used"""
+    
+    def __init__(self, path: str, max_entries: int = RECOMMENDATION_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.writes_since_eviction = 0
+        self.pending_touches = {}
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+        
+        connection = self.get_connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS recommendation_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS recommendation_cache_last_access ON recommendation_cache (last_access)"
+        )
+        connection.commit()
+    
+    def get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+    
+    def count(self, stat: str, amount: int = 1):
+        with self.lock:
+            self.stats[stat] += amount
+    
+    def get(self, key: str):
+        try:
+            connection = self.get_connection()
+            row = connection.execute("SELECT value FROM recommendation_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.count("misses")
+                return None
+            value = json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Shared cache read failed: {str(e)}")
+            self.count("errors")
+            return None
+        
+        self.count("hits")
+        with self.lock:
+            self.pending_touches[key] = time.time()
+            flush = len(self.pending_touches) >= SHARED_CACHE_TOUCH_BATCH
+        if flush:
+            try:
+                self.write_touches(connection)
+                connection.commit()
+            except sqlite3.Error as e:
+                print(f"Shared cache access-time update failed: {str(e)}")
+                self.count("errors")
+        return value
+    
+    def write_touches(self, connection: sqlite3.Connection):
+        """Write buffered last_access updates in the caller's transaction"""
+        with self.lock:
+            touches, self.pending_touches = self.pending_touches, {}
+        if touches:
+            connection.executemany(
+                "UPDATE recommendation_cache SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in touches.items()]
+            )
+    
+    def put(self, key: str, value: Dict):
+        try:
+            connection = self.get_connection()
+            connection.execute(
+                "INSERT OR REPLACE INTO recommendation_cache (key, value, last_access) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time())
+            )
+            self.write_touches(connection)
+            connection.commit()
+            self.count("writes")
+            
+            with self.lock:
+                self.writes_since_eviction += 1
+                check_size = self.writes_since_eviction >= SHARED_CACHE_EVICTION_INTERVAL
+                if check_size:
+                    self.writes_since_eviction = 0
+            if check_size:
+                self.evict(connection)
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"Shared cache write failed: {str(e)}")
+            self.count("errors")
+    
+    def evict(self, connection: sqlite3.Connection):
+        entries = connection.execute("SELECT COUNT(*) FROM recommendation_cache").fetchone()[0]
+        excess = entries - self.max_entries
+        if excess > 0:
+            connection.execute(
+                "DELETE FROM recommendation_cache WHERE key IN "
+                "(SELECT key FROM recommendation_cache ORDER BY last_access LIMIT ?)", (excess,)
+            )
+            connection.commit()
+            self.count("evictions", excess)
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            metrics = dict(self.stats)
+        try:
+            metrics["entries"] = self.get_connection().execute("SELECT COUNT(*) FROM recommendation_cache").fetchone()[0]
+        except sqlite3.Error:
+            metrics["entries"] = None
+        metrics["max_entries"] = self.max_entries
+        metrics["path"] = self.path
+        return metrics
+
+class RecommendationCache:
+    """Two-tier cache of get_recommendations results: an in-process LRU over an optional shared store"""
+    
+    def __init__(self, memory_size: int = RECOMMENDATION_CACHE_SIZE, shared_path: str = None,
+                 shared_max_entries: int = RECOMMENDATION_CACHE_MAX_ENTRIES):
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.shared = SharedRecommendationStore(shared_path, shared_max_entries) if shared_path else None
+    
+    def get(self, key: str):
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.stats["hits"] += 1
+                return self.memory[key]
+            self.stats["misses"] += 1
+        
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.store_in_memory(key, value)
+                return value
+        return None
+    
+    def put(self, key: str, value: Dict):
+        self.store_in_memory(key, value)
+        if self.shared is not None:
+            self.shared.put(key, value)
+    
+    def store_in_memory(self, key: str, value: Dict):
+        if self.memory_size <= 0:
+            return
+        with self.lock:
+            self.memory[key] = value
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.memory_size:
+                self.memory.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    @property
+    def capacity(self) -> int:
+        """Entries the largest tier can hold"""
+        return max(self.memory_size, self.shared.max_entries if self.shared is not None else 0)
+    
+    def memory_bytes(self) -> int:
+        with self.lock:
+            return deep_sizeof(self.memory)
+    
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            memory_metrics = dict(self.stats, entries=len(self.memory), max_entries=self.memory_size)
+        lookups = memory_metrics["hits"] + memory_metrics["misses"]
+        memory_metrics["hit_rate"] = round(memory_metrics["hits"] / lookups, 4) if lookups else 0.0
+        
+        metrics = {"memory": memory_metrics, "shared": None}
+        if self.shared is not None:
+            shared_metrics = self.shared.metrics()
+            shared_lookups = shared_metrics["hits"] + shared_metrics["misses"]
+            shared_metrics["hit_rate"] = round(shared_metrics["hits"] / shared_lookups, 4) if shared_lookups else 0.0
+            metrics["shared"] = shared_metrics
+        return metrics
+
+class HotProfileTracker:
+    """Bounded heavy-hitters tracker of request keys: a Count-Min sketch plus a top-K table"""
+    
+    def __init__(self, capacity: int = HOT_PROFILES_TOP_K, width: int = HOT_PROFILES_SKETCH_WIDTH,
+                 depth: int = HOT_PROFILES_SKETCH_DEPTH):
+        self.capacity = capacity
+        self.width = width
+        self.sketch = np.zeros((depth, width), dtype=np.uint32)
+        self.row_positions = np.arange(depth, dtype=np.uint64)
+        self.top = {}
+        self.min_count = 0
+        self.lock = threading.Lock()
+    
+    def sketch_columns(self, key: str) -> np.ndarray:
+        """Column per sketch row from double hashing one 128-bit digest"""
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first, second = np.frombuffer(digest, dtype=np.uint64)
+        return (first + self.row_positions * (second | np.uint64(1))) % np.uint64(self.width)
+    
+    def record(self, key: str, count: int = 1):
+        columns = self.sketch_columns(key)
+        rows = np.arange(len(columns))
+        with self.lock:
+            self.sketch[rows, columns] += np.uint32(count)
+            estimate = int(self.sketch[rows, columns].min())
+            if key in self.top or len(self.top) < self.capacity:
+                self.top[key] = estimate
+            elif estimate > self.min_count:
+                # min_count is a lower bound since top-K counts only grow; find the true minimum before evicting
+                coldest = min(self.top, key=self.top.get)
+                if estimate > self.top[coldest]:
+                    del self.top[coldest]
+                    self.top[key] = estimate
+                    coldest = min(self.top, key=self.top.get)
+                self.min_count = self.top[coldest]
+    
+    def hottest(self, limit: int = None) -> List[tuple]:
+        """(key, estimated count) pairs, hottest first"""
+        with self.lock:
+            ranked = sorted(self.top.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+    
+    def save(self, path: str):
+        """Atomically write the top-K keys and counts as JSON"""
+        snapshot = {
+            "saved_at": time.time(),
+            "profiles": [{"key": json.loads(key), "count": count} for key, count in self.hottest()]
+        }
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, 'w') as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+        os.replace(temporary_path, path)
+    
+    def load(self, path: str, decay: float = HOT_PROFILES_DECAY) -> List[Dict]:
+        """Seed the tracker from a saved set and return its keys, hottest first"""
+        with open(path) as snapshot_file:
+            profiles = json.load(snapshot_file).get("profiles", [])
+        keys = []
+        for entry in profiles[:self.capacity]:
+            key = entry["key"]
+            count = int(entry.get("count", 1) * decay)
+            if count > 0:
+                self.record(json.dumps(key, sort_keys=True), count)
+            keys.append(key)
+        return keys
+    
+    @property
+    def nbytes(self) -> int:
+        with self.lock:
+            return self.sketch.nbytes + deep_sizeof(self.top)
+
 class AdvancedCareerRecommender:
     def __init__(self):
-        self.career_database = self.create_comprehensive_career_database()
+        self.allocation_tracker = AllocationTracker(MEMORY_TRACKING_SAMPLE_RATE)
+        if RECOMMENDER_PRECISION not in SCORING_PRECISIONS:
+            raise ValueError(f"RECOMMENDER_PRECISION must be one of {', '.join(SCORING_PRECISIONS)}")
+        self.precision = RECOMMENDER_PRECISION
+        self.exact_rescore = RECOMMENDER_EXACT_RESCORE
+        self.recommendation_cache = RecommendationCache(
+            RECOMMENDATION_CACHE_SIZE, RECOMMENDATION_CACHE_PATH, RECOMMENDATION_CACHE_MAX_ENTRIES
+        )
         self.personality_archetypes = self.define_personality_archetypes()
         self.initialize_weights()
+        self.catalog_lock = threading.RLock()
+        # Serializes catalog reloads and tenant overlay changes
+        self.catalog_write_lock = threading.Lock()
+        self.catalog_version = 0
+        self.catalog_change_log = []
+        self.catalog_change_floor = 0
+        self.catalog_fingerprints = {}
+        self.career_digests = {}
+        self.profile_digests = {}
+        self.career_database = []
+        self.tenant_overlays = {}
+        self.load_catalog(self.read_catalog_source())
+        if TENANT_OVERLAYS_PATH:
+            with open(TENANT_OVERLAYS_PATH) as overlays_file:
+                for tenant_id, spec in json.load(overlays_file).items():
+                    self.set_tenant_overlay(tenant_id, spec)
+        self.ready = threading.Event()
+        self.hot_profiles = None
+        self.start_hot_profile_tracking()
         
     def create_comprehensive_career_database(self):
         """Create a diverse career database with detailed personality mappings"""
@@ -293,6 +1195,149 @@ class AdvancedCareerRecommender:
         ]
         return careers
 
+    def read_catalog_source(self) -> List[Dict]:
+        """Read the catalog from CAREER_CATALOG_PATH, falling back to the built-in catalog"""
+        if CAREER_CATALOG_PATH:
+            with open(CAREER_CATALOG_PATH) as catalog_file:
+                return json.load(catalog_file)
+        return self.create_comprehensive_career_database()
+
+    def load_catalog(self, careers: List[Dict]) -> Dict[str, Any]:
+        """Load or reload the catalog, versioning changed records and swapping in indexes built aside"""
+        if not isinstance(careers, list) or not all(isinstance(career, dict) for career in careers):
+            raise ValueError("careers must be a list of objects")
+        ids = [career.get("id") for career in careers]
+        if any(isinstance(career_id, bool) or not isinstance(career_id, int) for career_id in ids):
+            raise ValueError("every career needs an integer id")
+        if len(set(ids)) != len(ids):
+            raise ValueError("career ids must be unique")
+        
+        with self.catalog_write_lock:
+            previous_database = self.career_database
+            previous = {career["id"]: career for career in previous_database}
+            digests, profile_digests = {}, {}
+            changes = []
+            for career in careers:
+                content = {key: value for key, value in career.items() if key != "version"}
+                digests[career["id"]] = hashlib.md5(json.dumps(content, sort_keys=True).encode()).hexdigest()
+                profile_digests[career["id"]] = hashlib.md5(
+                    json.dumps(career.get("personality_profile"), sort_keys=True).encode()
+                ).hexdigest()
+                if career["id"] not in self.career_digests:
+                    changes.append((career["id"], "added"))
+                elif self.career_digests[career["id"]] != digests[career["id"]]:
+                    changes.append((career["id"], "changed"))
+            changes.extend((career_id, "removed") for career_id in previous if career_id not in digests)
+            
+            initial_load = self.catalog_version == 0
+            if not changes and not initial_load and ids == [career["id"] for career in previous_database]:
+                print(f"Catalog version {self.catalog_version} unchanged; indexes kept")
+                return {"catalog_version": self.catalog_token, "total": len(previous_database), "changes": 0}
+            
+            version = self.catalog_version + 1 if changes or initial_load else self.catalog_version
+            changed_ids = {career_id for career_id, _ in changes}
+            
+            database = []
+            for career in careers:
+                content = {key: value for key, value in career.items() if key != "version"}
+                career_version = version if career["id"] in changed_ids else previous[career["id"]]["version"]
+                database.append({**content, "version": career_version})
+            
+            # Neighbour lists depend only on row order and personality profiles
+            reuse_similar = not initial_load and ids == [career["id"] for career in previous_database] and all(
+                profile_digests[career_id] == self.profile_digests.get(career_id) for career_id in changed_ids
+            )
+            try:
+                staged = self.stage_catalog(database, reuse_similar)
+            except (KeyError, TypeError, AttributeError, ValueError) as e:
+                raise ValueError(f"Invalid career catalog: {str(e)}")
+            
+            with self.catalog_lock:
+                for name in CATALOG_STATE_ATTRIBUTES:
+                    setattr(self, name, getattr(staged, name))
+                self.catalog_version = version
+                self.career_digests = digests
+                self.profile_digests = profile_digests
+                if initial_load:
+                    self.catalog_change_floor = version
+                else:
+                    self.catalog_change_log.extend((version, career_id, op) for career_id, op in changes)
+                    excess = len(self.catalog_change_log) - CATALOG_CHANGE_LOG_SIZE
+                    if excess > 0:
+                        self.catalog_change_floor = self.catalog_change_log[excess - 1][0]
+                        del self.catalog_change_log[:excess]
+                self.catalog_fingerprints = {
+                    **{known: fingerprint for known, fingerprint in self.catalog_fingerprints.items()
+                       if known >= self.catalog_change_floor},
+                    version: self.catalog_fingerprint
+                }
+            print(f"Catalog version {version} loaded with {len(database)} careers ({len(changes)} changes"
+                  f"{', similar careers kept' if reuse_similar else ''})")
+        
+        return {"catalog_version": self.catalog_token, "total": len(database), "changes": len(changes)}
+
+    @property
+    def catalog_token(self) -> str:
+        """Catalog version token handed to clients: the version and the catalog fingerprint at that version"""
+        return f"{self.catalog_version}-{self.catalog_fingerprint}"
+
+    def get_catalog_token(self, tenant_id: str = None) -> str:
+        """Catalog version token for the catalog a tenant sees; overlay edits change it"""
+        with self.catalog_lock:
+            overlay = self.get_tenant_overlay(tenant_id)
+            return self.catalog_token if overlay is None else f"{self.catalog_token}-{overlay.fingerprint}"
+
+    def get_catalog_delta(self, since_token: str, tenant_id: str = None) -> Dict[str, Any]:
+        """Net added, changed and removed careers since a client's last-seen catalog version token"""
+        with self.catalog_lock:
+            overlay = self.get_tenant_overlay(tenant_id)
+            by_id = {career["id"]: career for career in self.career_database}
+            # Version numbers restart per process, so the fingerprint must match too
+            since, _, fingerprint = since_token.partition("-")
+            fingerprint, _, overlay_fingerprint = fingerprint.partition("-")
+            since = int(since) if since.isdigit() else -1
+            if (since < self.catalog_change_floor or self.catalog_fingerprints.get(since) != fingerprint or
+                    overlay_fingerprint != (overlay.fingerprint if overlay is not None else "")):
+                return {
+                    "catalog_version": self.get_catalog_token(tenant_id), "full_resync": True,
+                    "added": list(self.get_tenant_careers(tenant_id)), "changed": [], "removed": []
+                }
+            
+            first_ops, last_ops = {}, {}
+            for version, career_id, op in self.catalog_change_log:
+                if version > since:
+                    first_ops.setdefault(career_id, op)
+                    last_ops[career_id] = op
+            
+            added, changed, removed = [], [], []
+            for career_id, last_op in last_ops.items():
+                first_op = first_ops[career_id]
+                if last_op == "removed":
+                    if first_op != "added":
+                        removed.append(career_id)
+                elif first_op == "added":
+                    added.append(by_id[career_id])
+                else:
+                    changed.append(by_id[career_id])
+            if overlay is not None:
+                added, changed, removed = self.apply_overlay_to_delta(overlay, added, changed, removed)
+            
+            return {
+                "catalog_version": self.get_catalog_token(tenant_id), "full_resync": False,
+                "added": added, "changed": changed, "removed": removed
+            }
+
+    def apply_overlay_to_delta(self, overlay: TenantOverlay, added: List[Dict], changed: List[Dict],
+                               removed: List[int]) -> tuple:
+        """Map a base catalog delta onto a tenant's view, given an overlay unchanged since the client's token"""
+        overlay_careers = {career["id"]: career for career in overlay.careers}
+        # Hidden careers and tenant additions do not depend on the base record
+        shadowed = overlay.hidden | {career["id"] for career in overlay.added}
+        
+        def visible(careers):
+            return [overlay_careers.get(career["id"], career) for career in careers if career["id"] not in shadowed]
+        return visible(added), visible(changed), [career_id for career_id in removed if career_id not in shadowed]
+
     def define_personality_archetypes(self):
         """Define comprehensive personality archetypes for differentiation"""
         return {
@@ -320,11 +1365,380 @@ class AdvancedCareerRecommender:
             "traits": 0.10
         }
 
+    def stage_catalog(self, database: List[Dict], reuse_similar: bool = False) -> "AdvancedCareerRecommender":
+        """Build catalog indexes for database on a shallow copy, leaving the live catalog untouched"""
+        staged = copy.copy(self)
+        staged.career_database = database
+        staged.tenant_overlays = {tenant_id: copy.copy(overlay) for tenant_id, overlay in self.tenant_overlays.items()}
+        staged.build_catalog_indexes(reuse_similar)
+        return staged
+
+    def build_catalog_indexes(self, reuse_similar: bool = False):
+        """Precompute catalog-wide lookup structures used to narrow scoring"""
+        self.career_index_by_id = {career["id"]: index for index, career in enumerate(self.career_database)}
+        self.catalog_fingerprint = hashlib.sha256(
+            json.dumps(self.career_database, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        self.build_constraint_index()
+        profile_vectors = self.build_career_feature_matrix()
+        if not reuse_similar:
+            self.build_similar_careers_index(profile_vectors)
+        self.compiled_catalog = CompiledCatalog(self.career_database, self.precision)
+        self.rebuild_tenant_overlays()
+
+    def rebuild_tenant_overlays(self):
+        """Re-resolve every tenant overlay against a freshly loaded base catalog"""
+        for tenant_id, overlay in list(self.tenant_overlays.items()):
+            try:
+                overlay.build(self)
+            except ValueError as e:
+                print(f"Dropping tenant overlay {tenant_id}: {str(e)}")
+                del self.tenant_overlays[tenant_id]
+
+    def set_tenant_overlay(self, tenant_id: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """Create or replace a tenant's overlay"""
+        with self.catalog_write_lock:
+            previous = self.tenant_overlays.get(tenant_id)
+            overlay = TenantOverlay(tenant_id, spec, previous.version + 1 if previous else 1)
+            overlay.build(self)
+            with self.catalog_lock:
+                self.tenant_overlays = {**self.tenant_overlays, tenant_id: overlay}
+            print(f"Tenant overlay {tenant_id} v{overlay.version}: {len(overlay.careers)} careers, "
+                  f"{len(overlay.excluded_rows)} base careers excluded")
+            return self.describe_tenant_overlay(overlay)
+
+    def remove_tenant_overlay(self, tenant_id: str):
+        with self.catalog_write_lock:
+            if tenant_id not in self.tenant_overlays:
+                raise KeyError(tenant_id)
+            with self.catalog_lock:
+                self.tenant_overlays = {
+                    other: overlay for other, overlay in self.tenant_overlays.items() if other != tenant_id
+                }
+
+    def get_tenant_overlay(self, tenant_id: str = None):
+        """Look up a tenant's overlay; no tenant means the plain base catalog"""
+        if not tenant_id:
+            return None
+        overlay = self.tenant_overlays.get(tenant_id)
+        if overlay is None:
+            raise UnknownTenantError(tenant_id)
+        return overlay
+
+    def describe_tenant_overlay(self, overlay: TenantOverlay) -> Dict[str, Any]:
+        return {
+            "tenant_id": overlay.tenant_id,
+            "version": overlay.version,
+            "overlay_careers": len(overlay.careers),
+            "excluded_base_careers": len(overlay.excluded_rows),
+            "overlay_bytes": overlay.nbytes
+        }
+
+    def get_tenant_careers(self, tenant_id: str = None) -> List[Dict]:
+        """The catalog as a tenant sees it: unexcluded base careers followed by overlay careers"""
+        with self.catalog_lock:
+            overlay = self.get_tenant_overlay(tenant_id)
+            if overlay is None:
+                return self.career_database
+            excluded = set(overlay.excluded_rows.tolist())
+            return [career for index, career in enumerate(self.career_database) if index not in excluded] + overlay.careers
+
+    def get_overlay_eligibility_mask(self, overlay: TenantOverlay, constraints: Dict[str, Any] = None) -> np.ndarray:
+        """Apply already-validated constraints to an overlay's own careers"""
+        mask = np.ones(len(overlay.careers), dtype=bool)
+        if not constraints:
+            return mask
+        for index, career in enumerate(overlay.careers):
+            if constraints.get("categories") is not None and career["category"] not in constraints["categories"]:
+                mask[index] = False
+            elif constraints.get("min_salary") is not None and career["salary_min"] < constraints["min_salary"]:
+                mask[index] = False
+            elif (constraints.get("education") is not None and
+                  career.get("requirements", {}).get("education") not in constraints["education"]):
+                mask[index] = False
+        return mask
+
+    def build_constraint_index(self):
+        """Precompute boolean masks over the catalog for hard constraint filtering"""
+        catalog_size = len(self.career_database)
+        self.category_masks = {}
+        self.education_masks = {}
+        self.salary_min_array = np.array([career["salary_min"] for career in self.career_database], dtype=np.float64)
+        
+        for index, career in enumerate(self.career_database):
+            category = career["category"]
+            education = career.get("requirements", {}).get("education")
+            if category not in self.category_masks:
+                self.category_masks[category] = np.zeros(catalog_size, dtype=bool)
+            self.category_masks[category][index] = True
+            if education is not None:
+                if education not in self.education_masks:
+                    self.education_masks[education] = np.zeros(catalog_size, dtype=bool)
+                self.education_masks[education][index] = True
+
+    def build_career_feature_matrix(self) -> np.ndarray:
+        """Precompute L2-normalized career feature vectors; returns the raw profile vectors for the similarity index"""
+        self.ikigai_elements = sorted({element for career in self.career_database
+                                       for element in career["personality_profile"]["ikigai_weights"]})
+        self.trait_names = sorted({trait for career in self.career_database
+                                   for trait in career["personality_profile"]["trait_profile"]})
+        self.categories = sorted(self.category_masks)
+        
+        profile_vectors, feature_matrix = self.compute_career_features(self.career_database)
+        self.career_feature_matrix = QuantizedMatrix(feature_matrix, self.precision)
+        return profile_vectors
+
+    def compute_career_features(self, careers: List[Dict]) -> tuple:
+        """Raw personality profile vectors and L2-normalized feature vectors over the base catalog's columns"""
+        columns = (
+            [("mbti_weights", key) for key in MBTI_TYPES] +
+            [("riasec_weights", key) for key in RIASEC_TYPES] +
+            [("ikigai_weights", key) for key in self.ikigai_elements] +
+            [("trait_profile", key) for key in self.trait_names]
+        )
+        category_columns = {category: len(columns) + offset for offset, category in enumerate(self.categories)}
+        features = np.zeros((len(careers), len(columns) + len(self.categories)))
+        for row, career in enumerate(careers):
+            personality_profile = career["personality_profile"]
+            for column, (section, key) in enumerate(columns):
+                features[row, column] = personality_profile[section].get(key, 0.0)
+            if career["category"] in category_columns:
+                features[row, category_columns[career["category"]]] = 1.0
+        
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        return np.ascontiguousarray(features[:, :len(columns)]), features / np.where(norms > 0, norms, 1.0)
+
+    def build_similar_careers_index(self, vectors: np.ndarray, k: int = SIMILAR_CAREERS_K, block_size: int = None):
+        """Precompute each career's nearest neighbours by personality profile cosine similarity, in row blocks"""
+        catalog_size = len(vectors)
+        if block_size is None:
+            block_size = max(1, SIMILARITY_BLOCK_ELEMENTS // max(catalog_size, 1))
+        k = min(k, max(catalog_size - 1, 0))
+        self.similar_career_indices = np.zeros((catalog_size, k), dtype=np.int64)
+        self.similar_career_scores = np.zeros((catalog_size, k), dtype=np.float32)
+        if k == 0:
+            return
+        
+        for start in range(0, catalog_size, block_size):
+            end = min(start + block_size, catalog_size)
+            block = cosine_similarity(vectors[start:end], vectors)
+            block[np.arange(end - start), np.arange(start, end)] = -np.inf
+            
+            candidates = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            candidate_scores = np.take_along_axis(block, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            self.similar_career_indices[start:end] = np.take_along_axis(candidates, order, axis=1)
+            self.similar_career_scores[start:end] = np.take_along_axis(candidate_scores, order, axis=1)
+
+    def get_similar_careers(self, career_id: int, limit: int = SIMILAR_CAREERS_K, tenant_id: str = None) -> List[Dict]:
+        """Look up the nearest neighbours of a career in the catalog a tenant sees"""
+        with self.catalog_lock:
+            overlay = self.get_tenant_overlay(tenant_id)
+            index = self.career_index_by_id.get(career_id)
+            overlay_rows = {career["id"]: row for row, career in enumerate(overlay.careers)} if overlay else {}
+            excluded = set(overlay.excluded_rows.tolist()) if overlay else set()
+            
+            if career_id in overlay_rows:
+                vector = self.get_profile_vectors(overlay.feature_matrix, [overlay_rows[career_id]])[0]
+                neighbours = self.rank_base_similarity(vector, overlay.excluded_rows, limit)
+            elif index is not None and index not in excluded:
+                vector = self.get_profile_vectors(self.career_feature_matrix, [index])[0] if overlay else None
+                neighbours = [(neighbour, score) for neighbour, score in
+                              zip(self.similar_career_indices[index], self.similar_career_scores[index])
+                              if neighbour not in excluded][:limit]
+            else:
+                raise KeyError(career_id)
+            
+            candidates = [(float(score), self.career_database[neighbour]) for neighbour, score in neighbours]
+            if overlay is not None and overlay.careers:
+                overlay_scores = cosine_similarity(
+                    vector[np.newaxis], self.get_profile_vectors(overlay.feature_matrix, np.arange(len(overlay.careers)))
+                )[0]
+                candidates.extend((float(score), career) for score, career in zip(overlay_scores, overlay.careers)
+                                  if career["id"] != career_id)
+                candidates.sort(key=lambda candidate: -candidate[0])
+            
+            similar_careers = []
+            for score, career in candidates[:limit]:
+                career_data = career.copy()
+                career_data["similarity"] = round(score * 100, 1)
+                similar_careers.append(career_data)
+            return similar_careers
+
+    def get_profile_vectors(self, matrix: QuantizedMatrix, rows) -> np.ndarray:
+        """Personality profile columns of feature matrix rows; row normalization does not affect cosine similarity"""
+        width = len(MBTI_TYPES) + len(RIASEC_TYPES) + len(self.ikigai_elements) + len(self.trait_names)
+        return matrix.take(rows)[:, :width]
+
+    def rank_base_similarity(self, vector: np.ndarray, excluded_rows: np.ndarray, limit: int) -> List[tuple]:
+        """Most similar base careers to a profile vector, skipping excluded rows, computed in blocks"""
+        catalog_size = len(self.career_database)
+        block_size = max(1, SIMILARITY_BLOCK_ELEMENTS // max(self.career_feature_matrix.shape[1], 1))
+        scores = np.empty(catalog_size)
+        for start in range(0, catalog_size, block_size):
+            rows = np.arange(start, min(start + block_size, catalog_size))
+            scores[rows] = cosine_similarity(vector[np.newaxis], self.get_profile_vectors(self.career_feature_matrix, rows))[0]
+        scores[excluded_rows] = -np.inf
+        
+        limit = min(limit, catalog_size - len(excluded_rows))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return list(zip(top.tolist(), scores[top].tolist()))
+
+    def get_memory_report(self) -> Dict[str, int]:
+        """Report the approximate resident size in bytes of each recommender structure"""
+        structures = {
+            "career_database": self.career_database,
+            "catalog_change_log": [self.catalog_change_log, self.career_digests, self.profile_digests],
+            "career_index_by_id": self.career_index_by_id,
+            "constraint_index": [self.category_masks, self.education_masks, self.salary_min_array],
+            "similar_careers_index": [self.similar_career_indices, self.similar_career_scores],
+            "personality_archetypes": self.personality_archetypes
+        }
+        report = {name: deep_sizeof(structure) for name, structure in structures.items()}
+        report["career_feature_matrix"] = self.career_feature_matrix.nbytes
+        report["compiled_catalog"] = self.compiled_catalog.nbytes
+        report["tenant_overlays"] = sum(overlay.nbytes for overlay in list(self.tenant_overlays.values()))
+        report["recommendation_cache"] = self.recommendation_cache.memory_bytes()
+        if self.hot_profiles is not None:
+            report["hot_profiles"] = self.hot_profiles.nbytes
+        return report
+
+    def get_eligibility_mask(self, constraints: Dict[str, Any] = None) -> np.ndarray:
+        """Combine precomputed masks into an eligibility bitmask for categories, min_salary and education constraints"""
+        mask = np.ones(len(self.career_database), dtype=bool)
+        if not constraints:
+            return mask
+        if not isinstance(constraints, dict):
+            raise ValueError("constraints must be an object")
+        
+        unknown = set(constraints) - {"categories", "min_salary", "education"}
+        if unknown:
+            raise ValueError(f"Unsupported constraints: {', '.join(sorted(unknown))}")
+        
+        categories = constraints.get("categories")
+        if categories is not None:
+            if not isinstance(categories, list) or not all(isinstance(item, str) for item in categories):
+                raise ValueError("constraints.categories must be a list of strings")
+            category_mask = np.zeros(len(self.career_database), dtype=bool)
+            for category in categories:
+                if category in self.category_masks:
+                    category_mask |= self.category_masks[category]
+            mask &= category_mask
+        
+        min_salary = constraints.get("min_salary")
+        if min_salary is not None:
+            if isinstance(min_salary, bool) or not isinstance(min_salary, (int, float)):
+                raise ValueError("constraints.min_salary must be a number")
+            mask &= self.salary_min_array >= min_salary
+        
+        education = constraints.get("education")
+        if education is not None:
+            if not isinstance(education, list) or not all(isinstance(item, str) for item in education):
+                raise ValueError("constraints.education must be a list of strings")
+            education_mask = np.zeros(len(self.career_database), dtype=bool)
+            for level in education:
+                if level in self.education_masks:
+                    education_mask |= self.education_masks[level]
+            mask &= education_mask
+        
+        return mask
+
     def generate_user_profile_hash(self, user_profile: Dict[str, Any]) -> str:
         """Generate unique hash for each user profile combination"""
         profile_string = f"{user_profile.get('mbti', '')}-{'-'.join(sorted(user_profile.get('riasec', [])))}-{'-'.join(sorted(user_profile.get('ikigai', [])))}-{'-'.join(sorted(user_profile.get('skills', [])))}"
         return hashlib.md5(profile_string.encode()).hexdigest()[:8]
 
+    def get_cache_key(self, user_profile: Dict[str, Any], top_n: int, constraints: Dict[str, Any] = None,
+                      diversity: float = None, overlay: TenantOverlay = None) -> str:
+        """Build a cache key from the canonical profile, request options, catalog and weights versions"""
+        canonical = {
+            "profile": {field: user_profile[field] for field in CANONICAL_PROFILE_FIELDS if field in user_profile},
+            "top_n": top_n,
+            "constraints": constraints or None,
+            "diversity": diversity or None,
+            "catalog": self.catalog_fingerprint,
+            "weights": self.weights,
+            "precision": [self.precision, self.exact_rescore],
+            "schema": RECOMMENDATION_SCHEMA_VERSION,
+            "tenant": [overlay.tenant_id, overlay.fingerprint] if overlay is not None else None
+        }
+        return hashlib.sha256(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+    def get_hot_profile_key(self, user_profile: Dict[str, Any], top_n: int, constraints: Dict[str, Any] = None,
+                            diversity: float = None, tenant: str = None) -> str:
+        """Canonical request key tracked for pre-warming; unlike the cache key it can be replayed"""
+        return json.dumps({
+            "profile": {field: user_profile[field] for field in CANONICAL_PROFILE_FIELDS if field in user_profile},
+            "top_n": top_n,
+            "constraints": constraints or None,
+            "diversity": diversity or None,
+            "tenant": tenant
+        }, sort_keys=True)
+
+    def record_hot_profile(self, user_profile: Dict[str, Any], top_n: int, constraints: Dict[str, Any] = None,
+                           diversity: float = None, tenant: str = None):
+        """Count a served request towards the hot-profile set when tracking is enabled"""
+        if self.hot_profiles is not None:
+            self.hot_profiles.record(self.get_hot_profile_key(user_profile, top_n, constraints, diversity, tenant))
+
+    def start_hot_profile_tracking(self):
+        """Load the persisted hot-profile set, warm it in the background and start periodic persistence"""
+        if not HOT_PROFILES_PATH:
+            self.ready.set()
+            return
+        capacity = min(HOT_PROFILES_TOP_K, self.recommendation_cache.capacity)
+        if capacity < HOT_PROFILES_TOP_K:
+            print(f"HOT_PROFILES_TOP_K={HOT_PROFILES_TOP_K} exceeds the recommendation cache capacity; "
+                  f"tracking {capacity} hot profiles")
+        if capacity <= 0:
+            self.ready.set()
+            return
+        self.hot_profiles = HotProfileTracker(capacity)
+        
+        keys = []
+        if os.path.exists(HOT_PROFILES_PATH):
+            try:
+                keys = self.hot_profiles.load(HOT_PROFILES_PATH)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Ignoring unreadable hot-profile set {HOT_PROFILES_PATH}: {str(e)}")
+        threading.Thread(target=self.warm_hot_profiles, args=(keys,), name="hot-profile-warmer", daemon=True).start()
+        threading.Thread(target=self.persist_hot_profiles, name="hot-profile-persister", daemon=True).start()
+        atexit.register(self.save_hot_profiles)
+
+    def warm_hot_profiles(self, keys: List[Dict]):
+        """Recompute recommendations for persisted hot profiles (hottest first), then mark the service ready"""
+        started = time.perf_counter()
+        warmed = 0
+        keys = keys[:self.recommendation_cache.capacity]
+        try:
+            for key in reversed(keys):
+                try:
+                    self.get_recommendations(
+                        key["profile"], top_n=key["top_n"], constraints=key.get("constraints"),
+                        diversity=key.get("diversity"), tenant=key.get("tenant")
+                    )
+                    warmed += 1
+                except (ValueError, KeyError, TypeError) as e:
+                    # Profiles made invalid by a catalog, constraint or tenant change are skipped
+                    print(f"Skipping hot profile during warm-up: {str(e)}")
+        finally:
+            self.ready.set()
+        print(f"Warmed {warmed} of {len(keys)} hot profiles in {time.perf_counter() - started:.2f}s")
+
+    def persist_hot_profiles(self):
+        while True:
+            time.sleep(HOT_PROFILES_PERSIST_INTERVAL)
+            self.save_hot_profiles()
+
+    def save_hot_profiles(self):
+        try:
+            self.hot_profiles.save(HOT_PROFILES_PATH)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Failed to persist hot profiles: {str(e)}")
+
     def calculate_mbti_similarity(self, user_mbti: str, career_mbti_weights: Dict) -> float:
         """Calculate MBTI similarity with enhanced differentiation"""
         if not user_mbti:
@@ -346,17 +1760,7 @@ class AdvancedCareerRecommender:
 
     def get_cognitive_functions(self, mbti: str) -> List[str]:
         """Get cognitive functions for MBTI type"""
-        functions_map = {
-            'INTJ': ['Ni', 'Te', 'Fi', 'Se'], 'INTP': ['Ti', 'Ne', 'Si', 'Fe'],
-            'ENTJ': ['Te', 'Ni', 'Se', 'Fi'], 'ENTP': ['Ne', 'Ti', 'Fe', 'Si'],
-            'INFJ': ['Ni', 'Fe', 'Ti', 'Se'], 'INFP': ['Fi', 'Ne', 'Si', 'Te'],
-            'ENFJ': ['Fe', 'Ni', 'Se', 'Ti'], 'ENFP': ['Ne', 'Fi', 'Te', 'Si'],
-            'ISTJ': ['Si', 'Te', 'Fi', 'Ne'], 'ISFJ': ['Si', 'Fe', 'Ti', 'Ne'],
-            'ESTJ': ['Te', 'Si', 'Ne', 'Fi'], 'ESFJ': ['Fe', 'Si', 'Ne', 'Ti'],
-            'ISTP': ['Ti', 'Se', 'Ni', 'Fe'], 'ISFP': ['Fi', 'Se', 'Ni', 'Te'],
-            'ESTP': ['Se', 'Ti', 'Fe', 'Ni'], 'ESFP': ['Se', 'Fi', 'Te', 'Ni']
-        }
-        return functions_map.get(mbti, [])
+        return COGNITIVE_FUNCTIONS.get(mbti, [])
 
     def calculate_riasec_similarity(self, user_riasec: List[str], career_riasec_weights: Dict) -> float:
         """Calculate RIASEC similarity with priority ordering"""
@@ -412,12 +1816,7 @@ class AdvancedCareerRecommender:
 
     def calculate_trait_similarity(self, user_profile: Dict, career_trait_profile: Dict) -> float:
         """Calculate personality trait similarity"""
-        default_traits = {
-            "analytical": 0.5, "technical": 0.5, "creativity": 0.5, 
-            "social": 0.5, "leadership": 0.5, "structured": 0.5, "practical": 0.5
-        }
-        
-        user_traits = {**default_traits, **user_profile.get("traits", {})}
+        user_traits = {**DEFAULT_TRAITS, **user_profile.get("traits", {})}
         
         similarity_score = 0.0
         trait_count = 0
@@ -430,91 +1829,368 @@ class AdvancedCareerRecommender:
         
         return similarity_score / trait_count if trait_count > 0 else 0.5
 
-    def get_recommendations(self, user_profile: Dict[str, Any], top_n: int = 15) -> Dict[str, Any]:
-        """Get personalized career recommendations with guaranteed differentiation"""
-        user_hash = self.generate_user_profile_hash(user_profile)
-        print(f"Generating recommendations for profile hash: {user_hash}")
+    def diversify_recommendations(self, recommendations: List[Dict], top_n: int, diversity: float,
+                                  overlay: TenantOverlay = None) -> List[Dict]:
+        """Re-rank score-sorted candidates with maximal marginal relevance"""
+        if len(recommendations) <= 1 or top_n <= 1:
+            return recommendations[:top_n]
         
-        recommendations = []
+        relevance = np.array([rec["total_score"] for rec in recommendations])
+        features = np.array([
+            (overlay.feature_matrix if rec.get("overlay") else self.career_feature_matrix).take([rec["index"]])[0]
+            for rec in recommendations
+        ])
+        similarity = features @ features.T
         
-        for career in self.career_database:
-            personality_profile = career["personality_profile"]
-            
-            # Calculate individual similarity scores
-            mbti_score = self.calculate_mbti_similarity(
+        selected = [0]
+        available = np.ones(len(recommendations), dtype=bool)
+        available[0] = False
+        max_similarity = similarity[0].copy()
+        
+        while len(selected) < min(top_n, len(recommendations)):
+            mmr_scores = (1.0 - diversity) * relevance - diversity * max_similarity
+            mmr_scores[~available] = -np.inf
+            pick = int(np.argmax(mmr_scores))
+            selected.append(pick)
+            available[pick] = False
+            max_similarity = np.maximum(max_similarity, similarity[pick])
+        
+        return [recommendations[i] for i in selected]
+
+    def score_career(self, user_profile: Dict[str, Any], career: Dict) -> tuple:
+        """Score a single career exactly from its catalog record; returns (total, components)"""
+        personality_profile = career["personality_profile"]
+        
+        # Calculate individual similarity scores
+        components = {
+            "mbti": self.calculate_mbti_similarity(
                 user_profile.get("mbti"), 
                 personality_profile["mbti_weights"]
-            )
-            
-            riasec_score = self.calculate_riasec_similarity(
+            ),
+            "riasec": self.calculate_riasec_similarity(
                 user_profile.get("riasec", []),
                 personality_profile["riasec_weights"]
-            )
-            
-            ikigai_score = self.calculate_ikigai_similarity(
+            ),
+            "ikigai": self.calculate_ikigai_similarity(
                 user_profile.get("ikigai", []),
                 personality_profile["ikigai_weights"]
-            )
-            
-            skills_score = self.calculate_skills_similarity(
+            ),
+            "skills": self.calculate_skills_similarity(
                 user_profile.get("skills", []),
                 personality_profile["skill_domains"]
-            )
-            
-            trait_score = self.calculate_trait_similarity(
+            ),
+            "traits": self.calculate_trait_similarity(
                 user_profile,
                 personality_profile["trait_profile"]
             )
+        }
+        
+        # Calculate weighted total score
+        total_score = (
+            self.weights["mbti"] * components["mbti"] +
+            self.weights["riasec"] * components["riasec"] +
+            self.weights["ikigai"] * components["ikigai"] +
+            self.weights["skills"] * components["skills"] +
+            self.weights["traits"] * components["traits"]
+        )
+        return total_score, components
+
+    def build_recommendation(self, index: int, total_score: float, components: Dict[str, float],
+                             overlay: TenantOverlay = None) -> Dict:
+        """Package a scored career with its rounded component breakdown"""
+        return {
+            "index": int(index),
+            "career": (overlay.careers if overlay is not None else self.career_database)[index],
+            "overlay": overlay is not None,
+            "total_score": float(total_score),
+            "breakdown": {name: round(float(score), 3) for name, score in components.items()}
+        }
+
+    def score_careers(self, user_profile: Dict[str, Any], eligible_mask: np.ndarray, limit: int,
+                      threshold: bool = False, deadline: float = None, overlay: TenantOverlay = None) -> tuple:
+        """Score eligible careers (or an overlay's own careers) and return the best `limit` and stats"""
+        rescore = self.precision != "float64" and self.exact_rescore
+        pool_size = limit * RESCORE_POOL_FACTOR if rescore else limit
+        compiled = overlay.compiled if overlay is not None else self.compiled_catalog
+        careers = overlay.careers if overlay is not None else self.career_database
+        
+        if threshold:
+            rows, total, components, stats = compiled.threshold_top_k(
+                user_profile, self.weights, eligible_mask, pool_size, deadline
+            )
+        else:
+            eligible_indices = np.flatnonzero(eligible_mask)
+            total, components = compiled.score(user_profile, eligible_indices, self.weights)
+            top = top_k_indices(total, pool_size)
+            rows, total = eligible_indices[top], total[top]
+            components = {name: scores[top] for name, scores in components.items()}
+            stats = {"careers_scored": len(eligible_indices), "partial": False}
+        
+        if rescore:
+            rescored = [(index, *self.score_career(user_profile, careers[index])) for index in np.sort(rows)]
+            rescored.sort(key=lambda item: item[1], reverse=True)
+            return [self.build_recommendation(*item, overlay=overlay) for item in rescored[:limit]], stats
+        
+        return [
+            self.build_recommendation(rows[position], total[position],
+                                      {name: scores[position] for name, scores in components.items()}, overlay)
+            for position in range(min(limit, len(rows)))
+        ], stats
+
+    def score_tenant_careers(self, user_profile: Dict[str, Any], eligible_mask: np.ndarray, limit: int,
+                             threshold: bool = False, deadline: float = None, overlay: TenantOverlay = None,
+                             constraints: Dict[str, Any] = None) -> tuple:
+        """Score the base catalog minus the overlay's excluded rows, then the overlay's careers, and merge"""
+        if overlay is None:
+            candidates, stats = self.score_careers(user_profile, eligible_mask, limit, threshold, deadline)
+            stats["careers_considered"] = int(eligible_mask.sum())
+            return candidates, stats
+        
+        # Updates the caller's mask in place
+        eligible_mask[overlay.excluded_rows] = False
+        candidates, stats = self.score_careers(user_profile, eligible_mask, limit, threshold, deadline)
+        overlay_mask = self.get_overlay_eligibility_mask(overlay, constraints)
+        if overlay_mask.any():
+            overlay_candidates, overlay_stats = self.score_careers(
+                user_profile, overlay_mask, limit, threshold, deadline, overlay
+            )
+            candidates = sorted(candidates + overlay_candidates, key=lambda rec: rec["total_score"], reverse=True)[:limit]
+            stats = {
+                "careers_scored": stats["careers_scored"] + overlay_stats["careers_scored"],
+                "partial": stats["partial"] or overlay_stats["partial"]
+            }
+        stats["careers_considered"] = int(eligible_mask.sum() + overlay_mask.sum())
+        return candidates, stats
+
+    def sweep_catalog_rankings(self, compiled: CompiledCatalog, careers: List[Dict], rows: np.ndarray,
+                               user_profile: Dict[str, Any], traits: List[str], grid: List[tuple],
+                               top_n: int) -> List[List[tuple]]:
+        """Top-N (career, score) pairs of one compiled catalog at every grid point"""
+        base_score = (
+            self.weights["mbti"] * compiled.score_mbti(user_profile.get("mbti"), rows) +
+            self.weights["riasec"] * compiled.score_riasec(user_profile.get("riasec", []), rows) +
+            self.weights["ikigai"] * compiled.score_ikigai(user_profile.get("ikigai", []), rows) +
+            self.weights["skills"] * compiled.score_skills(user_profile.get("skills", []), rows)
+        )
+        
+        user_traits = np.tile(compiled.user_trait_vector(user_profile), (len(grid), 1))
+        for position, trait in enumerate(traits):
+            if trait in compiled.trait_names:
+                user_traits[:, compiled.trait_names.index(trait)] = [point[position] for point in grid]
+        
+        block = max(1, SWEEP_BLOCK_ELEMENTS // max(len(rows), 1))
+        rankings = []
+        for start in range(0, len(grid), block):
+            totals = base_score + self.weights["traits"] * compiled.score_traits(user_traits[start:start + block], rows)
+            for point_totals in totals:
+                top = top_k_indices(point_totals, top_n)
+                rankings.append([(careers[rows[position]], point_totals[position]) for position in top])
+        return rankings
+
+    def sweep_traits(self, user_profile: Dict[str, Any], traits: List[str], values: List[float],
+                     top_n: int = 15, constraints: Dict[str, Any] = None, tenant: str = None) -> Dict[str, Any]:
+        """Rank careers at every point of a trait grid for what-if slider exploration"""
+        if not isinstance(traits, list) or not traits or len(set(traits)) != len(traits):
+            raise ValueError("traits must be a non-empty list of distinct trait names")
+        if not isinstance(values, list) or not values or any(
+                isinstance(value, bool) or not isinstance(value, (int, float)) for value in values):
+            raise ValueError("values must be a non-empty list of numbers")
+        grid = list(itertools.product(values, repeat=len(traits)))
+        if len(grid) > MAX_SWEEP_POINTS:
+            raise ValueError(f"sweep grid has {len(grid)} points; the maximum is {MAX_SWEEP_POINTS}")
+        
+        with self.catalog_lock:
+            overlay = self.get_tenant_overlay(tenant)
+            known_traits = set(self.compiled_catalog.trait_names) | set(DEFAULT_TRAITS)
+            if overlay is not None:
+                known_traits |= set(overlay.compiled.trait_names)
+            unknown = [trait for trait in traits if trait not in known_traits]
+            if unknown:
+                raise ValueError(f"Unknown traits: {', '.join(unknown)}")
             
-            # Calculate weighted total score
-            total_score = (
-                self.weights["mbti"] * mbti_score +
-                self.weights["riasec"] * riasec_score +
-                self.weights["ikigai"] * ikigai_score +
-                self.weights["skills"] * skills_score +
-                self.weights["traits"] * trait_score
+            eligible_mask = self.get_eligibility_mask(constraints)
+            if overlay is not None:
+                eligible_mask[overlay.excluded_rows] = False
+            rows = np.flatnonzero(eligible_mask)
+            rankings = self.sweep_catalog_rankings(
+                self.compiled_catalog, self.career_database, rows, user_profile, traits, grid, top_n
             )
+            total_considered = len(rows)
             
-            # Add career to recommendations
-            recommendations.append({
-                "career": career,
-                "total_score": total_score,
-                "breakdown": {
-                    "mbti": round(mbti_score, 3),
-                    "riasec": round(riasec_score, 3),
-                    "ikigai": round(ikigai_score, 3),
-                    "skills": round(skills_score, 3),
-                    "traits": round(trait_score, 3)
-                }
+            if overlay is not None:
+                overlay_rows = np.flatnonzero(self.get_overlay_eligibility_mask(overlay, constraints))
+                overlay_rankings = self.sweep_catalog_rankings(
+                    overlay.compiled, overlay.careers, overlay_rows, user_profile, traits, grid, top_n
+                )
+                rankings = [
+                    sorted(base + extra, key=lambda item: item[1], reverse=True)[:top_n]
+                    for base, extra in zip(rankings, overlay_rankings)
+                ]
+                total_considered += len(overlay_rows)
+        
+        points = []
+        previous_ids = None
+        for point, ranking in zip(grid, rankings):
+            ids = [career["id"] for career, _ in ranking]
+            points.append({
+                "traits": dict(zip(traits, point)),
+                "top": [
+                    {"id": career["id"], "title": career["title"], "category": career["category"],
+                     "match": round(float(score) * 100, 1)}
+                    for career, score in ranking
+                ],
+                "entered": [] if previous_ids is None else [i for i in ids if i not in previous_ids],
+                "left": [] if previous_ids is None else [i for i in previous_ids if i not in ids]
             })
+            previous_ids = ids
         
-        # Sort by total score
-        recommendations.sort(key=lambda x: x["total_score"], reverse=True)
+        return {
+            "traits": traits,
+            "values": values,
+            "points": points,
+            "total_careers_considered": total_considered
+        }
+
+    def get_precision_report(self, top_n: int = 15) -> Dict[str, Any]:
+        """Compare the compiled catalog's precision against full float64 scoring on a fixed sample"""
+        with self.catalog_lock:
+            careers = self.career_database
+            compiled = self.compiled_catalog
         
-        # Return top N recommendations with analysis
-        top_recommendations = recommendations[:top_n]
+        if len(careers) > PRECISION_REPORT_SAMPLE_SIZE:
+            rows = np.sort(np.random.default_rng(0).choice(len(careers), PRECISION_REPORT_SAMPLE_SIZE, replace=False))
+        else:
+            rows = np.arange(len(careers))
+        if self.precision == "float64":
+            reference, reference_rows = compiled, rows
+        else:
+            reference, reference_rows = CompiledCatalog([careers[row] for row in rows]), np.arange(len(rows))
+        sample_mask = np.zeros(len(careers), dtype=bool)
+        sample_mask[rows] = True
         
-        # Generate enhanced career data with match percentages
-        enhanced_recommendations = []
-        for rec in top_recommendations:
-            career_data = rec["career"].copy()
-            match_score = round(rec["total_score"] * 100, 1)
+        sample_profiles = []
+        for i, mbti in enumerate(MBTI_TYPES):
+            sample_profiles.append({
+                "mbti": mbti,
+                "riasec": [RIASEC_TYPES[i % 6], RIASEC_TYPES[(i + 2) % 6]],
+                "ikigai": self.ikigai_elements[i % len(self.ikigai_elements):][:2] if self.ikigai_elements else [],
+                "traits": {trait: round((i * 7 + j * 3) % 10 / 10.0, 1) for j, trait in enumerate(DEFAULT_TRAITS)}
+            })
+        
+        rank_changes = {"quantized": [], "rescored": []}
+        for profile in sample_profiles:
+            exact_total, _ = reference.score(profile, reference_rows, self.weights)
+            exact_top = list(top_k_indices(exact_total, top_n))
+            quantized_total, _ = compiled.score(profile, rows, self.weights)
             
-            # Add match percentage and reasoning
-            career_data["match"] = match_score
-            career_data["ai_reasoning"] = self.generate_reasoning(rec["breakdown"], user_profile, career_data)
-            career_data["learning_path"] = self.generate_learning_path(career_data)
-            career_data["resources"] = self.get_career_resources(career_data)
-            career_data["personality_fit"] = self.calculate_personality_fit(user_profile, career_data)
+            # Served results: positions within the sample, and the totals they were ranked by
+            recommendations, _ = self.score_careers(profile, sample_mask, top_n)
+            served = np.searchsorted(rows, [rec["index"] for rec in recommendations]).astype(np.int64)
+            served_totals = np.array([rec["total_score"] for rec in recommendations])
             
-            enhanced_recommendations.append(career_data)
+            for mode, top, errors in (
+                ("quantized", list(top_k_indices(quantized_total, top_n)), np.abs(quantized_total - exact_total)),
+                ("rescored", list(served), np.abs(served_totals - exact_total[served]))
+            ):
+                rank_changes[mode].append({
+                    "overlap": len(set(top) & set(exact_top)) / max(len(exact_top), 1),
+                    "changed_positions": sum(1 for a, b in zip(top, exact_top) if a != b),
+                    "max_score_error": float(errors.max()) if len(errors) else 0.0
+                })
         
+        summary = {
+            mode: {
+                "mean_overlap": round(float(np.mean([c["overlap"] for c in changes])), 4),
+                "profiles_with_rank_changes": sum(1 for c in changes if c["changed_positions"]),
+                "max_changed_positions": max(c["changed_positions"] for c in changes),
+                "max_score_error": max(c["max_score_error"] for c in changes)
+            } for mode, changes in rank_changes.items()
+        }
+        # rescored.max_score_error covers only the served top-N, whose totals are exact when re-scoring is on
         return {
+            "precision": self.precision,
+            "exact_rescore": self.exact_rescore,
+            "compiled_bytes": compiled.nbytes,
+            "float64_bytes": compiled.float64_nbytes,
+            "saved_bytes": compiled.float64_nbytes - compiled.nbytes,
+            "careers_compared": len(rows),
+            "profiles_compared": len(sample_profiles),
+            "top_n": top_n,
+            "rank_changes": summary
+        }
+
+    def enrich_recommendation(self, rec: Dict, user_profile: Dict[str, Any]) -> Dict:
+        """Build the client-facing career record with match percentage and reasoning"""
+        career_data = rec["career"].copy()
+        match_score = round(rec["total_score"] * 100, 1)
+        
+        # Add match percentage and reasoning
+        career_data["match"] = match_score
+        career_data["breakdown"] = rec["breakdown"]
+        career_data["ai_reasoning"] = self.generate_reasoning(rec["breakdown"], user_profile, career_data)
+        career_data["learning_path"] = self.generate_learning_path(career_data)
+        career_data["resources"] = self.get_career_resources(career_data)
+        career_data["personality_fit"] = self.calculate_personality_fit(user_profile, career_data)
+        return career_data
+
+    def get_recommendations(self, user_profile: Dict[str, Any], top_n: int = 15,
+                            constraints: Dict[str, Any] = None, diversity: float = None,
+                            threshold: bool = False, deadline_ms: float = None, tenant: str = None) -> Dict[str, Any]:
+        """Get personalized career recommendations with guaranteed differentiation"""
+        if diversity is not None:
+            if isinstance(diversity, bool) or not isinstance(diversity, (int, float)) or not 0.0 <= diversity <= 1.0:
+                raise ValueError("diversity must be a number between 0 and 1")
+        deadline = None
+        if deadline_ms is not None:
+            if isinstance(deadline_ms, bool) or not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0:
+                raise ValueError("deadline_ms must be a positive number")
+            deadline = time.perf_counter() + deadline_ms / 1000.0
+            threshold = True
+        
+        user_hash = self.generate_user_profile_hash(user_profile)
+        sampled = self.allocation_tracker.should_sample()
+        with self.catalog_lock:
+            # The overlay and cache key must come from the same catalog as the scoring
+            overlay = self.get_tenant_overlay(tenant)
+            cache_key = self.get_cache_key(user_profile, top_n, constraints, diversity, overlay)
+            cached = self.recommendation_cache.get(cache_key)
+            if cached is None:
+                print(f"Generating recommendations for profile hash: {user_hash}")
+                with self.allocation_tracker.track("scoring", sampled):
+                    eligible_mask = self.get_eligibility_mask(constraints)
+                    
+                    # Return top N recommendations with analysis
+                    if diversity:
+                        candidates, stats = self.score_tenant_careers(
+                            user_profile, eligible_mask, top_n * DIVERSITY_POOL_FACTOR, threshold, deadline, overlay, constraints
+                        )
+                        top_recommendations = self.diversify_recommendations(candidates, top_n, diversity, overlay)
+                    else:
+                        top_recommendations, stats = self.score_tenant_careers(
+                            user_profile, eligible_mask, top_n, threshold, deadline, overlay, constraints
+                        )
+        if cached is not None:
+            # Cached results are shared between requests; callers must not mutate them
+            print(f"Serving cached recommendations for profile hash: {user_hash}")
+            return cached
+        
+        # Generate enhanced career data with match percentages
+        with self.allocation_tracker.track("enrichment", sampled):
+            enhanced_recommendations = [self.enrich_recommendation(rec, user_profile) for rec in top_recommendations]
+            analysis = self.analyze_user_profile(user_profile)
+        
+        result = {
             "user_profile_hash": user_hash,
             "recommendations": enhanced_recommendations,
-            "analysis": self.analyze_user_profile(user_profile),
-            "total_careers_considered": len(self.career_database)
+            "analysis": analysis,
+            "total_careers_considered": stats["careers_considered"],
+            "careers_scored": stats["careers_scored"],
+            "partial": stats["partial"]
         }
+        # Partial results depend on the deadline, so they are never cached
+        if not stats["partial"]:
+            self.recommendation_cache.put(cache_key, result)
+        return result
 
     def generate_reasoning(self, breakdown: Dict, user_profile: Dict, career: Dict) -> List[str]:
         """Generate detailed reasoning for each recommendation"""
@@ -753,26 +2429,191 @@ class AdvancedCareerRecommender:
 # Initialize the recommender
 recommender = AdvancedCareerRecommender()
 
+capture_lock = threading.Lock()
+
+def anonymize_request(user_data: Dict) -> Dict:
+    """Keep only the assessment fields that drive scoring, dropping any identifying data"""
+    user_profile = user_data.get('user_profile') or {}
+    anonymized = {
+        'user_profile': {field: user_profile[field] for field in CAPTURED_PROFILE_FIELDS if field in user_profile}
+    }
+    for field in CAPTURED_REQUEST_FIELDS:
+        if user_data.get(field) is not None:
+            anonymized[field] = user_data[field]
+    return anonymized
+
+def capture_request(user_data: Dict):
+    """Append an anonymized request body to the capture file when capture mode is enabled"""
+    if not CAPTURE_PATH:
+        return
+    try:
+        line = json.dumps(anonymize_request(user_data), sort_keys=True)
+        with capture_lock:
+            with open(CAPTURE_PATH, 'a') as capture_file:
+                capture_file.write(line + '\n')
+    except Exception as e:
+        print(f"Failed to capture request: {str(e)}")
+
+def admin_required(view):
+    """Reject requests without the admin bearer token; the endpoint is disabled unless a token is configured"""
+    @functools.wraps(view)
+    def guarded(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({
+                'success': False,
+                'error': 'Admin endpoints are disabled; set RECOMMENDER_ADMIN_TOKEN to enable them'
+            }), 403
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {ADMIN_TOKEN}'.encode()):
+            return jsonify({
+                'success': False,
+                'error': 'Missing or invalid admin token'
+            }), 401
+        return view(*args, **kwargs)
+    return guarded
+
+def get_request_tenant():
+    """Tenant selected by the request header, or None if absent; raises UnknownTenantError for unknown tenants"""
+    tenant = request.headers.get(TENANT_HEADER) or None
+    recommender.get_tenant_overlay(tenant)
+    return tenant
+
+def unknown_tenant_response():
+    return jsonify({
+        'success': False,
+        'error': f'Unknown tenant: {request.headers.get(TENANT_HEADER)}'
+    }), 404
+
+def offered_response_formats() -> List[str]:
+    """Response mimetypes this process can encode, JSON first so it wins ties"""
+    offered = [JSON_MIMETYPE]
+    if msgpack is not None:
+        offered.extend(MSGPACK_MIMETYPES)
+    if pa is not None:
+        offered.append(ARROW_MIMETYPE)
+    return offered
+
+def negotiate_response_format():
+    """Best response mimetype for the Accept header, JSON when absent, or None if nothing offered is acceptable"""
+    if not request.accept_mimetypes:
+        return JSON_MIMETYPE
+    return request.accept_mimetypes.best_match(offered_response_formats())
+
+def not_acceptable_response():
+    return jsonify({
+        'success': False,
+        'error': f'No acceptable response format; supported: {", ".join(offered_response_formats())}'
+    }), 406
+
+def arrow_metadata(payload: Dict, columnar_key: str) -> Dict[str, str]:
+    """Non-columnar payload fields as JSON-encoded Arrow schema metadata"""
+    return {key: json.dumps(value) for key, value in payload.items() if key != columnar_key}
+
+def recommendations_table(payload: Dict):
+    """Recommendations as columns of career ids, titles, match scores and the component breakdown"""
+    recommendations = payload['recommendations']
+    columns = {
+        'id': pa.array([rec['id'] for rec in recommendations], pa.int64()),
+        'title': pa.array([rec['title'] for rec in recommendations], pa.string()),
+        'category': pa.array([rec['category'] for rec in recommendations], pa.string()),
+        'match': pa.array([rec['match'] for rec in recommendations], pa.float64())
+    }
+    for name in SCORE_COMPONENTS:
+        columns[f'breakdown_{name}'] = pa.array([rec['breakdown'][name] for rec in recommendations], pa.float64())
+    return pa.table(columns).replace_schema_metadata(arrow_metadata(payload, 'recommendations'))
+
+def careers_table(payload: Dict):
+    """Catalog records as one column per scalar or list career field"""
+    schema = pa.schema([
+        (name, pa.list_(pa.string()) if kind == 'list<string>' else pa.type_for_alias(kind))
+        for name, kind in ARROW_CAREER_FIELDS
+    ])
+    table = pa.Table.from_pylist(payload['careers'], schema=schema)
+    return table.replace_schema_metadata(arrow_metadata(payload, 'careers'))
+
+def sweep_table(payload: Dict):
+    """Sweep results in long form: one row per grid point and rank"""
+    points = payload['points']
+    rows = [(point_index, rank, entry) for point_index, point in enumerate(points)
+            for rank, entry in enumerate(point['top'], 1)]
+    columns = {'point': pa.array([point_index for point_index, _, _ in rows], pa.int32())}
+    for trait in payload['traits']:
+        columns[f'trait_{trait}'] = pa.array(
+            [points[point_index]['traits'][trait] for point_index, _, _ in rows], pa.float64()
+        )
+    columns['rank'] = pa.array([rank for _, rank, _ in rows], pa.int32())
+    columns['id'] = pa.array([entry['id'] for _, _, entry in rows], pa.int64())
+    columns['title'] = pa.array([entry['title'] for _, _, entry in rows], pa.string())
+    columns['category'] = pa.array([entry['category'] for _, _, entry in rows], pa.string())
+    columns['match'] = pa.array([entry['match'] for _, _, entry in rows], pa.float64())
+    return pa.table(columns).replace_schema_metadata(arrow_metadata(payload, 'points'))
+
+def formatted_response(payload: Dict, mimetype: str, arrow_table):
+    """Encode a successful payload as JSON, MessagePack or an Arrow IPC stream built by arrow_table"""
+    if mimetype in MSGPACK_MIMETYPES:
+        response = Response(msgpack.packb(payload, use_bin_type=True), mimetype=mimetype)
+    elif mimetype == ARROW_MIMETYPE:
+        table = arrow_table(payload)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        response = Response(sink.getvalue().to_pybytes(), mimetype=ARROW_MIMETYPE)
+    else:
+        response = jsonify(payload)
+    response.vary.add('Accept')
+    return response
+
 @app.route('/api/recommend-careers', methods=['POST'])
 def recommend_careers():
     """Enhanced API endpoint for career recommendations"""
+    response_format = negotiate_response_format()
+    if response_format is None:
+        return not_acceptable_response()
+    try:
+        tenant = get_request_tenant()
+    except UnknownTenantError:
+        return unknown_tenant_response()
+    
     try:
         user_data = request.json
+        capture_request(user_data)
         user_profile = user_data.get('user_profile', {})
+        constraints = user_data.get('constraints')
+        diversity = user_data.get('diversity')
+        threshold = bool(user_data.get('threshold', False))
+        deadline_ms = user_data.get('deadline_ms')
         
         print(f"Received enhanced recommendation request for user: {user_profile}")
         
         # Get enhanced recommendations
-        recommendations = recommender.get_recommendations(user_profile, top_n=15)
+        recommendations = recommender.get_recommendations(
+            user_profile, top_n=15, constraints=constraints, diversity=diversity,
+            threshold=threshold, deadline_ms=deadline_ms, tenant=tenant
+        )
+        recommender.record_hot_profile(user_profile, 15, constraints, diversity, tenant)
         
-        return jsonify({
+        return formatted_response({
             'success': True,
             'recommendations': recommendations['recommendations'],
             'user_profile_analysis': recommendations['analysis'],
             'total_recommendations': len(recommendations['recommendations']),
+            'total_careers_considered': recommendations['total_careers_considered'],
+            'careers_scored': recommendations['careers_scored'],
+            'partial': recommendations['partial'],
             'profile_hash': recommendations['user_profile_hash'],
             'assessment_breakdown': get_assessment_breakdown(user_profile)
-        })
+        }, response_format, recommendations_table)
+    
+    except UnknownTenantError:
+        # The tenant overlay was removed while the request was in flight
+        return unknown_tenant_response()
+    
+    except ValueError as e:
+        print(f"Invalid recommendation request: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
     
     except Exception as e:
         print(f"Error in enhanced recommendation: {str(e)}")
@@ -781,16 +2622,126 @@ def recommend_careers():
             'error': str(e)
         }), 500
 
+@app.route('/api/recommend-careers/sweep', methods=['POST'])
+def sweep_recommendations():
+    """Rank careers across a grid of trait slider values in a single response"""
+    response_format = negotiate_response_format()
+    if response_format is None:
+        return not_acceptable_response()
+    try:
+        tenant = get_request_tenant()
+    except UnknownTenantError:
+        return unknown_tenant_response()
+    
+    try:
+        user_data = request.json
+        user_profile = user_data.get('user_profile', {})
+        top_n = user_data.get('top_n', 15)
+        if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 1:
+            raise ValueError("top_n must be a positive integer")
+        
+        sweep = recommender.sweep_traits(
+            user_profile, user_data.get('traits'), user_data.get('values'),
+            top_n=top_n, constraints=user_data.get('constraints'), tenant=tenant
+        )
+        print(f"Swept {len(sweep['points'])} trait grid points over {sweep['total_careers_considered']} careers")
+        return formatted_response({'success': True, **sweep}, response_format, sweep_table)
+    
+    except UnknownTenantError:
+        return unknown_tenant_response()
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    except Exception as e:
+        print(f"Error in trait sweep: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/careers', methods=['GET'])
 def get_all_careers():
     """Get all available careers"""
-    careers = recommender.career_database
+    response_format = negotiate_response_format()
+    if response_format is None:
+        return not_acceptable_response()
+    try:
+        tenant = get_request_tenant()
+        with recommender.catalog_lock:
+            careers = recommender.get_tenant_careers(tenant)
+            catalog_version = recommender.get_catalog_token(tenant)
+    except UnknownTenantError:
+        return unknown_tenant_response()
     print(f"Sending all {len(careers)} careers data")
-    return jsonify({
+    return formatted_response({
         'success': True,
         'careers': careers,
+        'catalog_version': catalog_version,
         'total': len(careers),
         'categories': list(set([career['category'] for career in careers]))
+    }, response_format, careers_table)
+
+@app.route('/api/careers/delta', methods=['GET'])
+def get_careers_delta():
+    """Get careers added, changed or removed since a client's last-seen catalog version"""
+    since = request.args.get('since')
+    if not since:
+        return jsonify({
+            'success': False,
+            'error': 'since must be a catalog version token'
+        }), 400
+    try:
+        delta = recommender.get_catalog_delta(since, get_request_tenant())
+    except UnknownTenantError:
+        return unknown_tenant_response()
+    
+    print(f"Sending catalog delta since version {since}: {len(delta['added'])} added, "
+          f"{len(delta['changed'])} changed, {len(delta['removed'])} removed")
+    return jsonify({
+        'success': True,
+        'since': since,
+        **delta
+    })
+
+@app.route('/api/admin/reload-catalog', methods=['POST'])
+@admin_required
+def reload_catalog():
+    """Reload the catalog from the request body or the configured catalog source"""
+    try:
+        user_data = request.get_json(silent=True) or {}
+        careers = user_data.get('careers')
+        result = recommender.load_catalog(careers if careers is not None else recommender.read_catalog_source())
+        return jsonify({'success': True, **result})
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/api/careers/<int:career_id>/similar', methods=['GET'])
+def get_similar_careers(career_id):
+    """Get careers with the most similar personality profiles"""
+    limit = request.args.get('limit', SIMILAR_CAREERS_K, type=int)
+    try:
+        similar_careers = recommender.get_similar_careers(career_id, limit=max(limit, 0), tenant_id=get_request_tenant())
+    except UnknownTenantError:
+        return unknown_tenant_response()
+    except KeyError:
+        return jsonify({
+            'success': False,
+            'error': f'Career {career_id} not found'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'career_id': career_id,
+        'similar_careers': similar_careers,
+        'total': len(similar_careers)
     })
 
 @app.route('/api/test-recommendation', methods=['GET'])
@@ -883,6 +2834,93 @@ def test_recommendation():
         'message': 'Enhanced ML differentiation test completed successfully'
     })
 
+@app.route('/api/admin/tenants', methods=['GET'])
+@admin_required
+def list_tenant_overlays():
+    """List tenant overlays and their sizes"""
+    overlays = list(recommender.tenant_overlays.values())
+    return jsonify({
+        'success': True,
+        'tenants': [recommender.describe_tenant_overlay(overlay) for overlay in overlays]
+    })
+
+@app.route('/api/admin/tenants/<tenant_id>', methods=['PUT'])
+@admin_required
+def put_tenant_overlay(tenant_id):
+    """Create or replace a tenant's add/hide/override overlay"""
+    try:
+        overlay = recommender.set_tenant_overlay(tenant_id, request.get_json(silent=True))
+        return jsonify({'success': True, **overlay})
+    
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@app.route('/api/admin/tenants/<tenant_id>', methods=['DELETE'])
+@admin_required
+def delete_tenant_overlay(tenant_id):
+    """Remove a tenant's overlay"""
+    try:
+        recommender.remove_tenant_overlay(tenant_id)
+        return jsonify({'success': True, 'tenant_id': tenant_id})
+    
+    except KeyError:
+        return jsonify({
+            'success': False,
+            'error': f'Unknown tenant: {tenant_id}'
+        }), 404
+
+@app.route('/api/admin/memory', methods=['GET'])
+@admin_required
+def memory_report():
+    """Report recommender structure sizes and sampled per-request allocations"""
+    structures = recommender.get_memory_report()
+    report = {
+        'success': True,
+        'catalog_size': len(recommender.career_database),
+        'structures_bytes': structures,
+        'total_structures_bytes': sum(structures.values()),
+        'allocations': recommender.allocation_tracker.report()
+    }
+    try:
+        import resource
+        # ru_maxrss is reported in kilobytes on Linux
+        report['process_max_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+    return jsonify(report)
+
+@app.route('/api/admin/precision', methods=['GET'])
+@admin_required
+def precision_report():
+    """Report compiled catalog memory savings and rank changes versus full precision"""
+    top_n = request.args.get('top_n', 15, type=int)
+    return jsonify({
+        'success': True,
+        **recommender.get_precision_report(top_n=max(top_n, 1))
+    })
+
+@app.route('/api/admin/cache', methods=['GET'])
+@admin_required
+def cache_metrics():
+    """Report hit, miss and eviction metrics for each recommendation cache tier"""
+    return jsonify({
+        'success': True,
+        'catalog_fingerprint': recommender.catalog_fingerprint,
+        'tiers': recommender.recommendation_cache.metrics()
+    })
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness endpoint; not ready until the persisted hot profiles have been warmed"""
+    ready = recommender.ready.is_set()
+    return jsonify({
+        'ready': ready,
+        'hot_profiles_tracked': len(recommender.hot_profiles.top) if recommender.hot_profiles is not None else 0
+    }), 200 if ready else 503
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -974,11 +3012,26 @@ if __name__ == '__main__':
     print("🚀 Starting Advanced Career Recommendation API...")
     print(f"📊 Career database loaded with {len(recommender.career_database)} diverse careers")
     print("🤖 Advanced ML model with guaranteed differentiation for all combinations")
+    if HOT_PROFILES_PATH:
+        print(f"🔥 Tracking hot profiles in {HOT_PROFILES_PATH} (warming in the background)")
+    if CAPTURE_PATH:
+        print(f"📝 Capturing anonymized recommendation requests to {CAPTURE_PATH}")
     print("🌐 API running on http://localhost:5001")
     print("\nAvailable endpoints:")
     print("  GET  /api/careers - Get all 15+ careers across categories")
     print("  POST /api/recommend-careers - Get AI-powered recommendations with match percentages") 
+    print("  GET  /api/careers/delta?since=<catalog_version> - Get catalog changes since a version token")
+    print("  POST /api/admin/reload-catalog - Reload the career catalog (needs RECOMMENDER_ADMIN_TOKEN)")
+    print("  GET  /api/careers/<id>/similar - Get careers with similar personality profiles")
+    print("  POST /api/recommend-careers/sweep - Rank careers across a grid of trait values")
     print("  GET  /api/test-recommendation - Test ML differentiation with 6+ profiles")
+    print("  GET  /api/admin/tenants - List tenant overlays (needs RECOMMENDER_ADMIN_TOKEN)")
+    print("  PUT  /api/admin/tenants/<tenant_id> - Create or replace a tenant overlay (needs RECOMMENDER_ADMIN_TOKEN; select with X-Tenant-ID)")
+    print("  GET  /api/admin/memory - Memory footprint and sampled allocation report (needs RECOMMENDER_ADMIN_TOKEN)")
+    print("  GET  /api/admin/precision - Compiled catalog precision savings and rank changes (needs RECOMMENDER_ADMIN_TOKEN)")
+    print("  GET  /api/admin/cache - Recommendation cache metrics per tier (needs RECOMMENDER_ADMIN_TOKEN)")
     print("  GET  /api/health - Health check")
+    print("  GET  /api/ready - Readiness (503 until hot profiles are warmed)")
+    print(f"\nResponse formats (Accept header): {', '.join(offered_response_formats())}")
     
     app.run(debug=True, host='0.0.0.0', port=5001)
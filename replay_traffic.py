@@ -0,0 +1,188 @@
+"""Replay captured /api/recommend-careers traffic against a local instance.
+
+Capture traffic by starting the API with RECOMMENDATION_CAPTURE_PATH set, then
+replay the recorded mix at a target rate:
+
+    python replay_traffic.py captured.jsonl --qps 50 --concurrency 8 --requests 2000
+
+Without --url the app is started in-process on a free localhost port, so the
+whole run stays offline. With --memory the report also includes the app's
+/api/admin/memory output, fetched with --admin-token (default:
+RECOMMENDER_ADMIN_TOKEN); for the in-process app allocation sampling is
+switched on for every request and a throwaway token is generated if none is set. Sampled requests still run concurrently, so
+per-phase allocation figures are approximate.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+import numpy as np
+
+RECOMMEND_PATH = '/api/recommend-careers'
+MEMORY_PATH = '/api/admin/memory'
+
+
+def load_captured_requests(path):
+    """Load captured request bodies, skipping blank or malformed lines"""
+    bodies = []
+    with open(path) as capture_file:
+        for line in capture_file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                bodies.append(json.loads(line))
+            except ValueError:
+                print(f"Skipping malformed capture line: {line[:80]}")
+    return bodies
+
+
+@contextlib.contextmanager
+def local_server():
+    """Start the Flask app on a free localhost port for the duration of the replay"""
+    from werkzeug.serving import make_server
+    from app import app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def send_request(url, body, timeout, scheduled=None):
+    """POST one body and return (latency_seconds, succeeded), timed from the scheduled send time if given"""
+    if scheduled is None:
+        scheduled = time.perf_counter()
+    payload = json.dumps(body).encode()
+    http_request = urllib.request.Request(url, data=payload, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(http_request, timeout=timeout) as response:
+            response.read()
+            succeeded = response.status == 200
+    except (urllib.error.URLError, OSError):
+        succeeded = False
+    return time.perf_counter() - scheduled, succeeded
+
+
+def replay(base_url, bodies, total_requests, qps, concurrency, timeout):
+    """Drive the captured mix open-loop at the target QPS and collect latency stats"""
+    url = base_url.rstrip('/') + RECOMMEND_PATH
+    interval = 1.0 / qps if qps > 0 else 0.0
+    futures = []
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for i, body in enumerate(islice(cycle(bodies), total_requests)):
+            scheduled = started + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            # Unpaced runs have no schedule to fall behind, so time from the actual send
+            futures.append(executor.submit(send_request, url, body, timeout, scheduled if interval else None))
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    errors = sum(1 for _, succeeded in results if not succeeded)
+    return {
+        'requests': len(results),
+        'errors': errors,
+        'error_rate': round(errors / len(results), 4) if results else 0.0,
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(results) / elapsed, 2) if elapsed > 0 else 0.0,
+        'latency_ms': {
+            'p50': round(float(np.percentile(latencies, 50)), 2),
+            'p95': round(float(np.percentile(latencies, 95)), 2),
+            'p99': round(float(np.percentile(latencies, 99)), 2),
+            'max': round(float(latencies.max()), 2)
+        } if results else {}
+    }
+
+
+def fetch_memory_report(base_url, timeout, admin_token):
+    """Fetch the app's memory footprint and allocation report"""
+    memory_request = urllib.request.Request(
+        base_url.rstrip('/') + MEMORY_PATH,
+        headers={'Authorization': f'Bearer {admin_token}'} if admin_token else {}
+    )
+    with urllib.request.urlopen(memory_request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def print_memory_report(memory):
+    print(f"Structures:  {memory['total_structures_bytes']} bytes for {memory['catalog_size']} careers")
+    for name, size in sorted(memory['structures_bytes'].items(), key=lambda item: -item[1]):
+        print(f"  {name}: {size} bytes")
+    for phase, stats in memory['allocations']['phases'].items():
+        print(f"Allocations {phase} (approximate): mean net {stats['mean_net_bytes']} bytes, "
+              f"mean peak {stats['mean_peak_bytes']} bytes over {stats['samples']} samples")
+
+
+def print_report(report):
+    print(f"Requests:    {report['requests']}")
+    print(f"Errors:      {report['errors']} ({report['error_rate'] * 100:.2f}%)")
+    print(f"Duration:    {report['duration_s']}s")
+    print(f"Throughput:  {report['throughput_rps']} req/s")
+    for name, value in report['latency_ms'].items():
+        print(f"Latency {name}: {value} ms")
+    if 'memory' in report:
+        print_memory_report(report['memory'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay captured recommendation traffic against a local instance')
+    parser.add_argument('capture_file', help='JSONL file written by RECOMMENDATION_CAPTURE_PATH capture mode')
+    parser.add_argument('--url', help='Base URL of a running local instance (default: start the app in-process)')
+    parser.add_argument('--qps', type=float, default=20.0, help='Target request rate (0 = as fast as possible)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Maximum in-flight requests')
+    parser.add_argument('--requests', type=int, help='Total requests to send (default: one pass over the capture)')
+    parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout in seconds')
+    parser.add_argument('--memory', action='store_true', help='Include the memory footprint and allocation report')
+    parser.add_argument('--admin-token', default=os.environ.get('RECOMMENDER_ADMIN_TOKEN'),
+                        help='Admin token for the memory report (default: RECOMMENDER_ADMIN_TOKEN)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--verbose', action='store_true', help="Keep the in-process app's request logging")
+    args = parser.parse_args()
+
+    bodies = load_captured_requests(args.capture_file)
+    if not bodies:
+        parser.error(f'no captured requests in {args.capture_file}')
+    total_requests = args.requests or len(bodies)
+
+    with contextlib.ExitStack() as stack:
+        base_url = args.url
+        if base_url is None:
+            if args.memory:
+                os.environ.setdefault('MEMORY_TRACKING_SAMPLE_RATE', '1')
+                args.admin_token = args.admin_token or secrets.token_urlsafe(16)
+                os.environ['RECOMMENDER_ADMIN_TOKEN'] = args.admin_token
+            if not args.verbose:
+                devnull = stack.enter_context(open(os.devnull, 'w'))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+            base_url = stack.enter_context(local_server())
+        report = replay(base_url, bodies, total_requests, args.qps, max(args.concurrency, 1), args.timeout)
+        if args.memory:
+            report['memory'] = fetch_memory_report(base_url, args.timeout, args.admin_token)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()